@@ -1,6 +1,7 @@
-from .base_controller import Controller
-import mido
-import time
+from .base_controller import Controller, build_decode_table, build_led_colours, build_led_messages, build_message_cache, \
+    decode
+from .framebuffer import Framebuffer
+from .meter import meter_thresholds, render_meter, draw_cells
 
 from . import errors
 
@@ -130,6 +131,8 @@ class InvalidButtonColour(errors.ControllerError):
 
 
 class APCMini(Controller):
+    ProductID = 40  # Product in the Device Enquiry reply
+
     GridMapping = [
         [0, 8, 16, 24, 32, 40, 48, 56],
         [1, 9, 17, 25, 33, 41, 49, 57],
@@ -150,6 +153,10 @@ class APCMini(Controller):
         "yellow": 5,
         "yellow_blinking": 6
     }  # Dict of all available colours for the grid
+    GridColourValues = {**{colour: colour for colour in range(7)}, **GridColours}  # Any valid colour to its velocity
+
+    MeterNotes = ()  # Grid notes column by column from the bottom up, built below
+    MeterColours = ("green",) * 5 + ("yellow",) * 2 + ("red",)  # Default colour of each meter row from the bottom
 
     FaderMapping = [48, 49, 50, 51, 52, 53, 54, 55, 56]  # Mapping of faders to their number indexed from 0
 
@@ -161,6 +168,7 @@ class APCMini(Controller):
         "green": 1,
         "green_blinking": 2
     }  # Dict of all colours for the side buttons
+    SideButtonColourValues = {**{colour: colour for colour in range(7)}, **SideButtonColours}  # Any valid colour to its velocity
 
     LowerButtonMapping = [64, 65, 66, 67, 68, 69, 70, 71]  # Mapping of lower buttons from left to right, indexed from 0
 
@@ -170,85 +178,51 @@ class APCMini(Controller):
         "red": 1,
         "red_blinking": 2
     }  # Dict of all colours for the lower buttons
+    LowerButtonColourValues = {**{colour: colour for colour in range(7)}, **LowerButtonColours}  # Any valid colour to its velocity
 
     ShiftButtonMapping = [98]
 
-    def __init__(self, midi_in=None, midi_out=None):
-        super().__init__(midi_in, midi_out)
+    def __init__(self, midi_in=None, midi_out=None, lazy=False):
+        super().__init__(midi_in, midi_out, lazy)
         self.name = "Akai APC Mini"  # Name of the device
         self.gridbuttons = APCMini.GridButtons(self)
         self.sidebuttons = APCMini.SideButtons(self)
         self.lowerbuttons = APCMini.LowerButtons(self)
-
-    def reset(self):
-        """Turns off all LEDs"""
-        for i in range(0, 89 + 1):
-            self.midi_out.send(mido.Message("note_on", note=i, velocity=0))
-            time.sleep(0.005)
-
-    def product_detect(self, event):
-        try:
-            if event.data[2] != 6:
-                raise errors.ControllerIdentificationError(self, self.midi_in, "Controller did not identify!")
-
-            if event.data[4] != 71:
-                raise errors.ControllerIdentificationError("MIDI device is not an Akai device!")
-
-            if event.data[5] != 40:
-                raise errors.ControllerIdentificationError("MIDI device is not an Akai APC Mini")
-        except (AttributeError, IndexError):
-            raise errors.ControllerIdentificationError(self, self.midi_in, "MIDI device failed to identify")
-        self.setup_in_progress = False
-        return True
-
-    def pre_event_dispatch(self, event):
-        if self.event_dispatch is None:
-            return  # Ignore if a dispatch event is not set with the on_event decorator
-
-        if event.type == "control_change":  # Event is a fader change
-            fader = APCMini.Fader(self, APCMini.Fader.get_fader_id_from_number(event.control), event.value)
-            self.event_dispatch(fader)
-
-        elif event.type == "note_on" or event.type == "note_off":  # Event is a button press
-            if event.note in range(0, 63 + 1):  # Button grid
-                if event.type == 'note_on':
-                    button = APCMini.GridButton(self, *APCMini.GridButton.get_xy_from_button_num(event.note), True)
-                    self.event_dispatch(button)
-
-                elif event.type == 'note_off':
-                    button = APCMini.GridButton(self, *APCMini.GridButton.get_xy_from_button_num(event.note), False)
-                    self.event_dispatch(button)
-
-            elif event.note in APCMini.SideButtonMapping:  # Side buttons
-                if event.type == 'note_on':
-                    button = APCMini.SideButton(self, APCMini.SideButton.get_button_id_from_button_num(event.note),
-                                                True)
-                    self.event_dispatch(button)
-
-                elif event.type == 'note_off':
-                    button = APCMini.SideButton(self, APCMini.SideButton.get_button_id_from_button_num(event.note),
-                                                False)
-                    self.event_dispatch(button)
-
-            elif event.note in APCMini.LowerButtonMapping:  # Lower buttons
-                if event.type == 'note_on':
-                    button = APCMini.LowerButton(self, APCMini.LowerButton.get_button_id_from_button_num(event.note),
-                                                 True)
-                    self.event_dispatch(button)
-
-                elif event.type == 'note_off':
-                    button = APCMini.LowerButton(self, APCMini.LowerButton.get_button_id_from_button_num(event.note),
-                                                 False)
-                    self.event_dispatch(button)
-
-            elif event.note in APCMini.ShiftButtonMapping:
-                if event.type == 'note_on':
-                    button = APCMini.ShiftButton(self, True)
-                    self.event_dispatch(button)
-
-                elif event.type == 'note_off':
-                    button = APCMini.ShiftButton(self, False)
-                    self.event_dispatch(button)
+        self.framebuffer = Framebuffer(self, [note for column in APCMini.GridMapping for note in column] +
+                                       APCMini.SideButtonMapping + APCMini.LowerButtonMapping)
+
+    def on_grid_button(self, x=None, y=None):
+        """Decorator for a function called when grid buttons change, None for x or y matches every column or row"""
+        notes = [note for column_x, column in enumerate(APCMini.GridMapping) for row_y, note in enumerate(column)
+                 if x in (None, column_x) and y in (None, row_y)]
+        if not notes:
+            raise InvalidGridButton(self, self.midi_in, (x, y))
+        return self.handler_decorator(notes=notes)
+
+    def on_fader(self, fader_id=None):
+        """Decorator for a function called when a fader moves, or any fader if fader_id is None"""
+        controls = self.select(APCMini.FaderMapping, fader_id)
+        if not controls:
+            raise InvalidFader(self, self.midi_in, fader_id)
+        return self.handler_decorator(controls=controls)
+
+    def on_side_button(self, button_id=None):
+        """Decorator for a function called when a side button changes, or any side button if button_id is None"""
+        notes = self.select(APCMini.SideButtonMapping, button_id)
+        if not notes:
+            raise InvalidSideButton(self, self.midi_in, button_id)
+        return self.handler_decorator(notes=notes)
+
+    def on_lower_button(self, button_id=None):
+        """Decorator for a function called when a lower button changes, or any lower button if button_id is None"""
+        notes = self.select(APCMini.LowerButtonMapping, button_id)
+        if not notes:
+            raise InvalidLowerButton(self, self.midi_in, button_id)
+        return self.handler_decorator(notes=notes)
+
+    def on_shift_button(self):
+        """Decorator for a function called when the shift button changes"""
+        return self.handler_decorator(notes=APCMini.ShiftButtonMapping)
 
     class GridButtons:  # All the grid buttons
         def __init__(self, controller):
@@ -258,7 +232,55 @@ class APCMini(Controller):
             """Sets an LED on the button grid"""
             APCMini.GridButton(self.controller, x, y).set_led(colour)
 
+        def draw(self, x, y, colour):
+            """Draws an LED on the button grid into the framebuffer, sent on the next flush"""
+            APCMini.GridButton(self.controller, x, y).draw(colour)
+
+        def set_many(self, leds):
+            """Sets many LEDs on the button grid from an iterable of (x, y, colour), sent as one batch"""
+            for x, y, colour in leds:
+                APCMini.GridButton(self.controller, x, y).draw(colour)
+            self.controller.flush()
+
+        def fill_region(self, x1, y1, x2, y2, colour):
+            """Sets every LED in the rectangle between two corners (inclusive) to the colour given, in one batch"""
+            self.set_many((x, y, colour) for x in range(min(x1, x2), max(x1, x2) + 1)
+                          for y in range(min(y1, y2), max(y1, y2) + 1))
+
+        def fill_row(self, y, colour):
+            """Sets every LED in a row of the button grid to the colour given, in one batch"""
+            self.fill_region(0, y, 7, y, colour)
+
+        def fill_column(self, x, colour):
+            """Sets every LED in a column of the button grid to the colour given, in one batch"""
+            self.fill_region(x, 0, x, 7, colour)
+
+        def fill(self, colour):
+            """Sets every LED on the button grid to the colour given, in one batch"""
+            self.fill_region(0, 0, 7, 7, colour)
+
+        def clear(self):
+            """Turns off every LED on the button grid, in one batch"""
+            self.fill("off")
+
+        def meter(self, levels, thresholds=None, colours=None, maximum=127):
+            """Draws up to 8 levels as bar graphs in the grid columns from the left and sends the LEDs that changed.
+            levels can be a list or a numpy array, thresholds are the 8 levels each row lights up above (evenly
+            spaced from 0 to maximum by default) and colours the colour of each row, from the bottom up"""
+            levels = levels[:8]
+            if thresholds is None:
+                thresholds = meter_thresholds(maximum)
+            colours = [APCMini.GridButton(self.controller, 0, y).resolve_led(colour)[1]
+                       for y, colour in enumerate(APCMini.MeterColours if colours is None else colours)]
+            cells = render_meter(levels, thresholds, colours)
+            framebuffer = self.controller.framebuffer
+            with framebuffer.lock:
+                draw_cells(framebuffer.canvas(), APCMini.MeterNotes, cells)
+                return framebuffer.flush()
+
     class GridButton:  # A specific grid button
+        __slots__ = ("controller", "x", "y", "state")
+
         def __init__(self, controller, x: int, y: int, state: bool = False):
             self.controller = controller
             self.x = x
@@ -267,36 +289,33 @@ class APCMini(Controller):
 
         @staticmethod
         def get_xy_from_button_num(button_num):
-            for column in APCMini.GridMapping:
-                x = APCMini.GridMapping.index(column)
-                if button_num in column:
-                    return x, APCMini.GridMapping[x].index(button_num)
-                else:
-                    continue
-            raise InvalidGridButton(None, None, button_num)
+            xy = decode(APCMini.NoteTable, button_num, APCMini.GridButton)
+            if xy is None:
+                raise InvalidGridButton(None, None, button_num)
+            return xy
+
+        def resolve_led(self, colour):
+            """Returns the MIDI note and velocity that set this button's LED to the colour given"""
+            try:
+                colour = APCMini.GridColourValues[colour]
+            except (KeyError, TypeError):
+                raise InvalidButtonColour(self.controller, self.controller.midi_in, self)
+            try:
+                return APCMini.GridMapping[self.x][self.y], colour
+            except IndexError:
+                raise InvalidGridButton(self.controller, self.controller.midi_in, (self.x, self.y))
 
         def set_led(self, colour):
             """Sets this specific button's LED to be the colour given"""
-            if isinstance(colour, int):
-                if 0 <= colour <= 6:
-                    try:
-                        self.controller.midi_out.send(
-                            mido.Message("note_on", note=APCMini.GridMapping[self.x][self.y], velocity=colour))
-                    except IndexError:
-                        raise InvalidGridButton(self.controller, self.controller.midi_in, (self.x, self.y))
-                else:
-                    raise InvalidButtonColour(self.controller, self.controller.midi_in, self)
-            else:
-                if colour in APCMini.GridColours:
-                    try:
-                        self.controller.midi_out.send(mido.Message("note_on", note=APCMini.GridMapping[self.x][self.y],
-                                                                   velocity=APCMini.GridColours[colour]))
-                    except IndexError:
-                        raise InvalidGridButton(self.controller, self.controller.midi_in, (self.x, self.y))
-                else:
-                    raise InvalidButtonColour(self.controller, self.controller.midi_in, self)
+            self.controller.framebuffer.set(*self.resolve_led(colour))
+
+        def draw(self, colour):
+            """Draws this specific button's LED into the framebuffer, sent on the next flush"""
+            self.controller.framebuffer.draw(*self.resolve_led(colour))
 
     class Fader:  # A single fader
+        __slots__ = ("controller", "fader_id", "value")
+
         def __init__(self, controller, fader_id, value):
             self.controller = controller
             self.fader_id = fader_id
@@ -304,10 +323,10 @@ class APCMini(Controller):
 
         @staticmethod
         def get_fader_id_from_number(fader_num):
-            try:
-                return APCMini.FaderMapping.index(fader_num)
-            except IndexError:
+            fader = decode(APCMini.ControlTable, fader_num, APCMini.Fader)
+            if fader is None:
                 raise InvalidFader(None, None, fader_num)
+            return fader[0]
 
     class SideButtons:  # All the side buttons
         def __init__(self, controller):
@@ -317,7 +336,27 @@ class APCMini(Controller):
             """Sets an LED on the side buttons"""
             APCMini.SideButton(self.controller, button_id).set_led(colour)
 
+        def draw(self, button_id, colour):
+            """Draws an LED on the side buttons into the framebuffer, sent on the next flush"""
+            APCMini.SideButton(self.controller, button_id).draw(colour)
+
+        def set_many(self, leds):
+            """Sets many LEDs on the side buttons from an iterable of (button_id, colour), sent as one batch"""
+            for button_id, colour in leds:
+                APCMini.SideButton(self.controller, button_id).draw(colour)
+            self.controller.flush()
+
+        def fill(self, colour):
+            """Sets every LED on the side buttons to the colour given, in one batch"""
+            self.set_many((button_id, colour) for button_id in range(len(APCMini.SideButtonMapping)))
+
+        def clear(self):
+            """Turns off every LED on the side buttons, in one batch"""
+            self.fill("off")
+
     class SideButton:  # A specific side button
+        __slots__ = ("controller", "button_id", "state")
+
         def __init__(self, controller, button_id: int, state: bool = False):
             self.controller = controller
             self.button_id = button_id
@@ -325,29 +364,29 @@ class APCMini(Controller):
 
         @staticmethod
         def get_button_id_from_button_num(button_num):
-            return APCMini.SideButtonMapping.index(button_num)
+            button = decode(APCMini.NoteTable, button_num, APCMini.SideButton)
+            if button is None:
+                raise InvalidSideButton(None, None, button_num)
+            return button[0]
+
+        def resolve_led(self, colour):
+            """Returns the MIDI note and velocity that set this button's LED to the colour given"""
+            try:
+                colour = APCMini.SideButtonColourValues[colour]
+            except (KeyError, TypeError):
+                raise InvalidButtonColour(self.controller, self.controller.midi_in, self)
+            try:
+                return APCMini.SideButtonMapping[self.button_id], colour
+            except IndexError:
+                raise InvalidSideButton(self.controller, self.controller.midi_in, self.button_id)
 
         def set_led(self, colour):
             """Sets this specific button's LED to be the colour given"""
-            if isinstance(colour, int):
-                if 0 <= colour <= 6:
-                    try:
-                        self.controller.midi_out.send(
-                            mido.Message("note_on", note=APCMini.SideButtonMapping[self.button_id], velocity=colour))
-                    except IndexError:
-                        raise InvalidSideButton(self.controller, self.controller.midi_in, self.button_id)
-                else:
-                    raise InvalidButtonColour(self.controller, self.controller.midi_in, self)
-            else:
-                if colour in APCMini.SideButtonColours:
-                    try:
-                        self.controller.midi_out.send(
-                            mido.Message("note_on", note=APCMini.SideButtonMapping[self.button_id],
-                                         velocity=APCMini.SideButtonColours[colour]))
-                    except IndexError:
-                        raise InvalidLowerButton(self.controller, self.controller.midi_in, self.button_id)
-                else:
-                    raise InvalidButtonColour(self.controller, self.controller.midi_in, self)
+            self.controller.framebuffer.set(*self.resolve_led(colour))
+
+        def draw(self, colour):
+            """Draws this specific button's LED into the framebuffer, sent on the next flush"""
+            self.controller.framebuffer.draw(*self.resolve_led(colour))
 
     class LowerButtons:  # All the lower buttons
         def __init__(self, controller):
@@ -357,7 +396,27 @@ class APCMini(Controller):
             """Sets an LED on the lower buttons"""
             APCMini.LowerButton(self.controller, button_id).set_led(colour)
 
+        def draw(self, button_id, colour):
+            """Draws an LED on the lower buttons into the framebuffer, sent on the next flush"""
+            APCMini.LowerButton(self.controller, button_id).draw(colour)
+
+        def set_many(self, leds):
+            """Sets many LEDs on the lower buttons from an iterable of (button_id, colour), sent as one batch"""
+            for button_id, colour in leds:
+                APCMini.LowerButton(self.controller, button_id).draw(colour)
+            self.controller.flush()
+
+        def fill(self, colour):
+            """Sets every LED on the lower buttons to the colour given, in one batch"""
+            self.set_many((button_id, colour) for button_id in range(len(APCMini.LowerButtonMapping)))
+
+        def clear(self):
+            """Turns off every LED on the lower buttons, in one batch"""
+            self.fill("off")
+
     class LowerButton:  # A specific side button
+        __slots__ = ("controller", "button_id", "state")
+
         def __init__(self, controller, button_id: int, state: bool = False):
             self.controller = controller
             self.button_id = button_id
@@ -365,34 +424,62 @@ class APCMini(Controller):
 
         @staticmethod
         def get_button_id_from_button_num(button_num):
+            button = decode(APCMini.NoteTable, button_num, APCMini.LowerButton)
+            if button is None:
+                raise InvalidLowerButton(None, None, button_num)
+            return button[0]
+
+        def resolve_led(self, colour):
+            """Returns the MIDI note and velocity that set this button's LED to the colour given"""
+            try:
+                colour = APCMini.LowerButtonColourValues[colour]
+            except (KeyError, TypeError):
+                raise InvalidButtonColour(self.controller, self.controller.midi_in, self)
             try:
-                return APCMini.LowerButtonMapping.index(button_num)
+                return APCMini.LowerButtonMapping[self.button_id], colour
             except IndexError:
-                raise InvalidLowerButton(None, None, button_num)
+                raise InvalidLowerButton(self.controller, self.controller.midi_in, self.button_id)
 
         def set_led(self, colour):
             """Sets this specific button's LED to be the colour given"""
-            if isinstance(colour, int):
-                if 0 <= colour <= 6:
-                    try:
-                        self.controller.midi_out.send(
-                            mido.Message("note_on", note=APCMini.LowerButtonMapping[self.button_id], velocity=colour))
-                    except IndexError:
-                        raise InvalidLowerButton(self.controller, self.controller.midi_in, self.button_id)
-                else:
-                    raise InvalidButtonColour(self.controller, self.controller.midi_in, self)
-            else:
-                if colour in APCMini.LowerButtonColours:
-                    try:
-                        self.controller.midi_out.send(
-                            mido.Message("note_on", note=APCMini.LowerButtonMapping[self.button_id],
-                                         velocity=APCMini.LowerButtonColours[colour]))
-                    except IndexError:
-                        raise InvalidLowerButton(self.controller, self.controller.midi_in, self.button_id)
-                else:
-                    raise InvalidButtonColour(self.controller, self.controller.midi_in, self)
+            self.controller.framebuffer.set(*self.resolve_led(colour))
+
+        def draw(self, colour):
+            """Draws this specific button's LED into the framebuffer, sent on the next flush"""
+            self.controller.framebuffer.draw(*self.resolve_led(colour))
 
     class ShiftButton:  # The shift button
+        __slots__ = ("controller", "state")
+
         def __init__(self, controller, state: bool = False):
             self.controller = controller
             self.state = state
+
+
+APCMini.NoteTable = build_decode_table(
+    [(note, APCMini.GridButton, (x, y)) for x, column in enumerate(APCMini.GridMapping) for y, note in enumerate(column)] +
+    [(note, APCMini.SideButton, (i,)) for i, note in enumerate(APCMini.SideButtonMapping)] +
+    [(note, APCMini.LowerButton, (i,)) for i, note in enumerate(APCMini.LowerButtonMapping)] +
+    [(note, APCMini.ShiftButton, ()) for note in APCMini.ShiftButtonMapping]
+)
+APCMini.ControlTable = build_decode_table(
+    [(control, APCMini.Fader, (i,)) for i, control in enumerate(APCMini.FaderMapping)]
+)
+APCMini.LEDMessages = build_led_messages(
+    [note for column in APCMini.GridMapping for note in column] + APCMini.SideButtonMapping + APCMini.LowerButtonMapping,
+    len(APCMini.GridColours)
+)
+APCMini.MessageCache = build_message_cache(APCMini.LEDMessages)
+APCMini.LEDColours = build_led_colours([
+    ([note for column in APCMini.GridMapping for note in column], APCMini.GridColourValues),
+    (APCMini.SideButtonMapping, APCMini.SideButtonColourValues),
+    (APCMini.LowerButtonMapping, APCMini.LowerButtonColourValues)
+])
+APCMini.MeterNotes = tuple(APCMini.GridMapping[x][y] for x in range(8) for y in range(8))
+APCMini.MirrorLayout = (
+    ("faders", "control", APCMini.FaderMapping, None),
+    ("grid", "note", [note for column in APCMini.GridMapping for note in column], (8, 8)),
+    ("side", "note", APCMini.SideButtonMapping, None),
+    ("lower", "note", APCMini.LowerButtonMapping, None),
+    ("shift", "note", APCMini.ShiftButtonMapping, None),
+)
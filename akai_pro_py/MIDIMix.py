@@ -1,6 +1,6 @@
-from .base_controller import Controller
-import mido
-import time
+from .base_controller import Controller, build_decode_table, build_led_colours, build_led_messages, build_message_cache, \
+    decode
+from .framebuffer import Framebuffer
 from . import errors
 
 
@@ -138,6 +138,8 @@ class InvalidFader(errors.ControllerError):
 
 
 class MIDIMix(Controller):
+    ProductID = 49  # Product in the Device Enquiry reply
+
     KnobGridMapping = [
         [18, 17, 16],
         [22, 21, 20],
@@ -158,6 +160,7 @@ class MIDIMix(Controller):
         "red": 1,
         "on": 1
     }
+    RecArmColourValues = {**{colour: colour for colour in range(2)}, **RecArmColours}  # Any valid colour to its velocity
 
     MuteMapping = [1, 4, 7, 10, 13, 16, 19, 22]
     MuteColours = {
@@ -165,6 +168,7 @@ class MIDIMix(Controller):
         "yellow": 1,
         "on": 1
     }
+    MuteColourValues = {**{colour: colour for colour in range(2)}, **MuteColours}  # Any valid colour to its velocity
 
     BlankMapping = [26, 25]
     BlankColours = {
@@ -172,91 +176,61 @@ class MIDIMix(Controller):
         "yellow": 1,
         "on": 1
     }
+    BlankColourValues = {**{colour: colour for colour in range(2)}, **BlankColours}  # Any valid colour to its velocity
 
     SoloMapping = [27]
 
-    def __init__(self, midi_in=None, midi_out=None):
-        super().__init__(midi_in, midi_out)
+    def __init__(self, midi_in=None, midi_out=None, lazy=False):
+        super().__init__(midi_in, midi_out, lazy)
         self.name = "Akai MIDI Mix"  # Name of the device
         self.mutebuttons = MIDIMix.MuteButtons(self)
         self.recarmbuttons = MIDIMix.RecArmButtons(self)
         self.blankbuttons = MIDIMix.BlankButtons(self)
-
-    def product_detect(self, event):
-        try:
-            if event.data[2] != 6:
-                raise errors.ControllerIdentificationError(self, self.midi_in, "Controller did not identify!")
-
-            if event.data[4] != 71:
-                raise errors.ControllerIdentificationError(self, self.midi_in, "MIDI device is not an Akai device!")
-
-            if event.data[5] != 49:
-                raise errors.ControllerIdentificationError(self, self.midi_in, "MIDI device is not an Akai MIDI Mix")
-                          
-        except (AttributeError, KeyError):
-            raise errors.ControllerIdentificationError(self, self.midi_in, "MIDI device failed to identify")
-        self.setup_in_progress = False
-        return True
-
-    def pre_event_dispatch(self, event):
-        if self.event_dispatch is None:
-            return  # Ignore if a dispatch event is not set with the on_event decorator
-
-        if event.type == "control_change":  # Event is a fader or knob change
-            if event.control in MIDIMix.FaderMapping:
-                fader = MIDIMix.Fader(self, MIDIMix.Fader.get_fader_id_from_number(event.control), event.value)
-                self.event_dispatch(fader)
-            elif event.control in MIDIMix.Knobs:
-                knob = MIDIMix.Knob(self, *MIDIMix.Knob.get_knob_xy_from_number(event.control), event.value)
-                self.event_dispatch(knob)
-
-        elif event.type == "note_on" or event.type == "note_off":
-            if event.note in MIDIMix.RecArmMapping:
-                if event.type == "note_on":
-                    button = MIDIMix.RecArmButton(self, MIDIMix.RecArmButton.get_button_id_from_button_num(event.note),
-                                                  True)
-                    self.event_dispatch(button)
-                elif event.type == "note_off":
-                    button = MIDIMix.RecArmButton(self, MIDIMix.RecArmButton.get_button_id_from_button_num(event.note),
-                                                  False)
-                    self.event_dispatch(button)
-
-            elif event.note in MIDIMix.MuteMapping:
-                if event.type == "note_on":
-                    button = MIDIMix.MuteButton(self, MIDIMix.MuteButton.get_button_id_from_button_num(event.note),
-                                                True)
-                    self.event_dispatch(button)
-                elif event.type == "note_off":
-                    button = MIDIMix.MuteButton(self, MIDIMix.MuteButton.get_button_id_from_button_num(event.note),
-                                                False)
-                    self.event_dispatch(button)
-
-            elif event.note in MIDIMix.BlankMapping:
-                if event.type == "note_on":
-                    button = MIDIMix.BlankButton(self, MIDIMix.BlankButton.get_button_id_from_button_num(event.note),
-                                                 True)
-                    self.event_dispatch(button)
-                elif event.type == "note_off":
-                    button = MIDIMix.BlankButton(self, MIDIMix.BlankButton.get_button_id_from_button_num(event.note),
-                                                 False)
-                    self.event_dispatch(button)
-
-            elif event.note in MIDIMix.SoloMapping:
-                if event.type == "note_on":
-                    button = MIDIMix.SoloButton(self, True)
-                    self.event_dispatch(button)
-                elif event.type == "note_off":
-                    button = MIDIMix.SoloButton(self, False)
-                    self.event_dispatch(button)
-
-    def reset(self):
-        for ButtonGroup in [MIDIMix.MuteMapping, MIDIMix.RecArmMapping, MIDIMix.BlankMapping]:
-            for Button in ButtonGroup:
-                self.midi_out.send(
-                    mido.Message("note_on", note=Button, velocity=0))
-                time.sleep(0.005)
+        self.framebuffer = Framebuffer(self, MIDIMix.MuteMapping + MIDIMix.RecArmMapping + MIDIMix.BlankMapping)
+
+    def on_knob(self, x=None, y=None):
+        """Decorator for a function called when knobs turn, None for x or y matches every column or row"""
+        controls = [control for column_x, column in enumerate(MIDIMix.KnobGridMapping)
+                    for row_y, control in enumerate(column) if x in (None, column_x) and y in (None, row_y)]
+        if not controls:
+            raise InvalidKnob(self, self.midi_in, (x, y))
+        return self.handler_decorator(controls=controls)
+
+    def on_fader(self, fader_id=None):
+        """Decorator for a function called when a fader moves, or any fader if fader_id is None"""
+        controls = self.select(MIDIMix.FaderMapping, fader_id)
+        if not controls:
+            raise InvalidFader(self, self.midi_in, fader_id)
+        return self.handler_decorator(controls=controls)
+
+    def on_mute_button(self, button_id=None):
+        """Decorator for a function called when a mute button changes, or any mute button if button_id is None"""
+        notes = self.select(MIDIMix.MuteMapping, button_id)
+        if not notes:
+            raise InvalidMuteButton(self, self.midi_in, button_id)
+        return self.handler_decorator(notes=notes)
+
+    def on_rec_arm_button(self, button_id=None):
+        """Decorator for a function called when a record arm button changes, or any if button_id is None"""
+        notes = self.select(MIDIMix.RecArmMapping, button_id)
+        if not notes:
+            raise InvalidRecArmButton(self, self.midi_in, button_id)
+        return self.handler_decorator(notes=notes)
+
+    def on_blank_button(self, button_id=None):
+        """Decorator for a function called when a blank button changes, or any blank button if button_id is None"""
+        notes = self.select(MIDIMix.BlankMapping, button_id)
+        if not notes:
+            raise InvalidBlankButton(self, self.midi_in, button_id)
+        return self.handler_decorator(notes=notes)
+
+    def on_solo_button(self):
+        """Decorator for a function called when the solo button changes"""
+        return self.handler_decorator(notes=MIDIMix.SoloMapping)
 
     class Fader:
+        __slots__ = ("controller", "fader_id", "value")
+
         def __init__(self, controller, fader_id, value):
             self.controller = controller
             self.fader_id = fader_id
@@ -264,12 +238,14 @@ class MIDIMix(Controller):
 
         @staticmethod
         def get_fader_id_from_number(fader_num):
-            try:
-                return MIDIMix.FaderMapping.index(fader_num)
-            except IndexError:
+            fader = decode(MIDIMix.ControlTable, fader_num, MIDIMix.Fader)
+            if fader is None:
                 raise InvalidFader(None, None, fader_num)
+            return fader[0]
 
     class Knob:
+        __slots__ = ("controller", "x", "y", "value")
+
         def __init__(self, controller, x, y, value):
             self.controller = controller
             self.x = x
@@ -278,13 +254,10 @@ class MIDIMix(Controller):
 
         @staticmethod
         def get_knob_xy_from_number(knob_num):
-            for column in MIDIMix.KnobGridMapping:
-                x = MIDIMix.KnobGridMapping.index(column)
-                if knob_num in column:
-                    return x, MIDIMix.KnobGridMapping[x].index(knob_num)
-                else:
-                    continue
-            raise InvalidKnob(None, None, knob_num)
+            xy = decode(MIDIMix.ControlTable, knob_num, MIDIMix.Knob)
+            if xy is None:
+                raise InvalidKnob(None, None, knob_num)
+            return xy
 
     class MuteButtons:  # All the lower buttons
         def __init__(self, controller):
@@ -294,7 +267,27 @@ class MIDIMix(Controller):
             """Sets an LED on the lower buttons"""
             MIDIMix.MuteButton(self.controller, button_id).set_led(colour)
 
+        def draw(self, button_id, colour):
+            """Draws an LED on the mute buttons into the framebuffer, sent on the next flush"""
+            MIDIMix.MuteButton(self.controller, button_id).draw(colour)
+
+        def set_many(self, leds):
+            """Sets many LEDs on the mute buttons from an iterable of (button_id, colour), sent as one batch"""
+            for button_id, colour in leds:
+                MIDIMix.MuteButton(self.controller, button_id).draw(colour)
+            self.controller.flush()
+
+        def fill(self, colour):
+            """Sets every LED on the mute buttons to the colour given, in one batch"""
+            self.set_many((button_id, colour) for button_id in range(len(MIDIMix.MuteMapping)))
+
+        def clear(self):
+            """Turns off every LED on the mute buttons, in one batch"""
+            self.fill("off")
+
     class MuteButton:  # A specific side button
+        __slots__ = ("controller", "button_id", "state")
+
         def __init__(self, controller, button_id: int, state: bool = False):
             self.controller = controller
             self.button_id = button_id
@@ -302,32 +295,29 @@ class MIDIMix(Controller):
 
         @staticmethod
         def get_button_id_from_button_num(button_num):
+            button = decode(MIDIMix.NoteTable, button_num, MIDIMix.MuteButton)
+            if button is None:
+                raise InvalidMuteButton(None, None, button_num)
+            return button[0]
+
+        def resolve_led(self, colour):
+            """Returns the MIDI note and velocity that set this button's LED to the colour given"""
+            try:
+                colour = MIDIMix.MuteColourValues[colour]
+            except (KeyError, TypeError):
+                raise InvalidButtonColour(self.controller, self.controller.midi_in, self)
             try:
-                return MIDIMix.MuteMapping.index(button_num)
+                return MIDIMix.MuteMapping[self.button_id], colour
             except IndexError:
-                raise InvalidMuteButton(None, None, button_num)
+                raise InvalidMuteButton(self.controller, self.controller.midi_in, self.button_id)
 
         def set_led(self, colour):
             """Sets this specific button's LED to be the colour given"""
-            if isinstance(colour, int):
-                if 0 <= colour <= 1:
-                    try:
-                        self.controller.midi_out.send(
-                            mido.Message("note_on", note=MIDIMix.MuteMapping[self.button_id], velocity=colour))
-                    except IndexError:
-                        raise InvalidMuteButton(self.controller, self.controller.midi_in, self.button_id)
-                else:
-                    raise InvalidButtonColour(self.controller, self.controller.midi_in, self)
-            else:
-                if colour in MIDIMix.MuteColours:
-                    try:
-                        self.controller.midi_out.send(
-                            mido.Message("note_on", note=MIDIMix.MuteMapping[self.button_id],
-                                         velocity=MIDIMix.MuteColours[colour]))
-                    except IndexError:
-                        raise InvalidMuteButton(self.controller, self.controller.midi_in, self.button_id)
-                else:
-                    raise InvalidButtonColour(self.controller, self.controller.midi_in, self)
+            self.controller.framebuffer.set(*self.resolve_led(colour))
+
+        def draw(self, colour):
+            """Draws this specific button's LED into the framebuffer, sent on the next flush"""
+            self.controller.framebuffer.draw(*self.resolve_led(colour))
 
     class RecArmButtons:  # All the lower buttons
         def __init__(self, controller):
@@ -337,7 +327,27 @@ class MIDIMix(Controller):
             """Sets an LED on the lower buttons"""
             MIDIMix.RecArmButton(self.controller, button_id).set_led(colour)
 
+        def draw(self, button_id, colour):
+            """Draws an LED on the record arm buttons into the framebuffer, sent on the next flush"""
+            MIDIMix.RecArmButton(self.controller, button_id).draw(colour)
+
+        def set_many(self, leds):
+            """Sets many LEDs on the record arm buttons from an iterable of (button_id, colour), sent as one batch"""
+            for button_id, colour in leds:
+                MIDIMix.RecArmButton(self.controller, button_id).draw(colour)
+            self.controller.flush()
+
+        def fill(self, colour):
+            """Sets every LED on the record arm buttons to the colour given, in one batch"""
+            self.set_many((button_id, colour) for button_id in range(len(MIDIMix.RecArmMapping)))
+
+        def clear(self):
+            """Turns off every LED on the record arm buttons, in one batch"""
+            self.fill("off")
+
     class RecArmButton:  # A specific side button
+        __slots__ = ("controller", "button_id", "state")
+
         def __init__(self, controller, button_id: int, state: bool = False):
             self.controller = controller
             self.button_id = button_id
@@ -345,32 +355,29 @@ class MIDIMix(Controller):
 
         @staticmethod
         def get_button_id_from_button_num(button_num):
-            try:
-                return MIDIMix.RecArmMapping.index(button_num)
-            except:
+            button = decode(MIDIMix.NoteTable, button_num, MIDIMix.RecArmButton)
+            if button is None:
                 raise InvalidRecArmButton(None, None, button_num)
+            return button[0]
+
+        def resolve_led(self, colour):
+            """Returns the MIDI note and velocity that set this button's LED to the colour given"""
+            try:
+                colour = MIDIMix.RecArmColourValues[colour]
+            except (KeyError, TypeError):
+                raise InvalidButtonColour(self.controller, self.controller.midi_in, self)
+            try:
+                return MIDIMix.RecArmMapping[self.button_id], colour
+            except IndexError:
+                raise InvalidRecArmButton(self.controller, self.controller.midi_in, self.button_id)
 
         def set_led(self, colour):
             """Sets this specific button's LED to be the colour given"""
-            if isinstance(colour, int):
-                if 0 <= colour <= 1:
-                    try:
-                        self.controller.midi_out.send(
-                            mido.Message("note_on", note=MIDIMix.RecArmMapping[self.button_id], velocity=colour))
-                    except IndexError:
-                        raise InvalidRecArmButton(self.controller, self.controller.midi_in, self.button_id)
-                else:
-                    raise InvalidButtonColour(self.controller, self.controller.midi_in, self)
-            else:
-                if colour in MIDIMix.RecArmColours:
-                    try:
-                        self.controller.midi_out.send(
-                            mido.Message("note_on", note=MIDIMix.RecArmMapping[self.button_id],
-                                         velocity=MIDIMix.RecArmColours[colour]))
-                    except IndexError:
-                        raise InvalidRecArmButton(self.controller, self.controller.midi_in, self.button_id)
-                else:
-                    raise InvalidButtonColour(self.controller, self.controller.midi_in, self)
+            self.controller.framebuffer.set(*self.resolve_led(colour))
+
+        def draw(self, colour):
+            """Draws this specific button's LED into the framebuffer, sent on the next flush"""
+            self.controller.framebuffer.draw(*self.resolve_led(colour))
 
     class BlankButtons:  # All the lower buttons
         def __init__(self, controller):
@@ -380,7 +387,27 @@ class MIDIMix(Controller):
             """Sets an LED on the lower buttons"""
             MIDIMix.BlankButton(self.controller, button_id).set_led(colour)
 
+        def draw(self, button_id, colour):
+            """Draws an LED on the blank buttons into the framebuffer, sent on the next flush"""
+            MIDIMix.BlankButton(self.controller, button_id).draw(colour)
+
+        def set_many(self, leds):
+            """Sets many LEDs on the blank buttons from an iterable of (button_id, colour), sent as one batch"""
+            for button_id, colour in leds:
+                MIDIMix.BlankButton(self.controller, button_id).draw(colour)
+            self.controller.flush()
+
+        def fill(self, colour):
+            """Sets every LED on the blank buttons to the colour given, in one batch"""
+            self.set_many((button_id, colour) for button_id in range(len(MIDIMix.BlankMapping)))
+
+        def clear(self):
+            """Turns off every LED on the blank buttons, in one batch"""
+            self.fill("off")
+
     class BlankButton:  # A specific side button
+        __slots__ = ("controller", "button_id", "state")
+
         def __init__(self, controller, button_id: int, state: bool = False):
             self.controller = controller
             self.button_id = button_id
@@ -388,34 +415,60 @@ class MIDIMix(Controller):
 
         @staticmethod
         def get_button_id_from_button_num(button_num):
+            button = decode(MIDIMix.NoteTable, button_num, MIDIMix.BlankButton)
+            if button is None:
+                raise InvalidBlankButton(None, None, button_num)
+            return button[0]
+
+        def resolve_led(self, colour):
+            """Returns the MIDI note and velocity that set this button's LED to the colour given"""
             try:
-                return MIDIMix.BlankMapping.index(button_num)
+                colour = MIDIMix.BlankColourValues[colour]
+            except (KeyError, TypeError):
+                raise InvalidButtonColour(self.controller, self.controller.midi_in, self)
+            try:
+                return MIDIMix.BlankMapping[self.button_id], colour
             except IndexError:
-                raise InvalidBlankButton(None, None, button_num)
+                raise InvalidBlankButton(self.controller, self.controller.midi_in, self.button_id)
 
         def set_led(self, colour):
             """Sets this specific button's LED to be the colour given"""
-            if isinstance(colour, int):
-                if 0 <= colour <= 1:
-                    try:
-                        self.controller.midi_out.send(
-                            mido.Message("note_on", note=MIDIMix.BlankMapping[self.button_id], velocity=colour))
-                    except IndexError:
-                        raise InvalidBlankButton(self.controller, self.controller.midi_in, self.button_id)
-                else:
-                    raise InvalidButtonColour(self.controller, self.controller.midi_in, self)
-            else:
-                if colour in MIDIMix.RecArmColours:
-                    try:
-                        self.controller.midi_out.send(
-                            mido.Message("note_on", note=MIDIMix.BlankMapping[self.button_id],
-                                         velocity=MIDIMix.BlankColours[colour]))
-                    except IndexError:
-                        raise InvalidBlankButton(self.controller, self.controller.midi_in, self.button_id)
-                else:
-                    raise InvalidButtonColour(self.controller, self.controller.midi_in, self)
+            self.controller.framebuffer.set(*self.resolve_led(colour))
+
+        def draw(self, colour):
+            """Draws this specific button's LED into the framebuffer, sent on the next flush"""
+            self.controller.framebuffer.draw(*self.resolve_led(colour))
 
     class SoloButton:  # The shift button
+        __slots__ = ("controller", "state")
+
         def __init__(self, controller, state: bool = False):
             self.controller = controller
             self.state = state
+
+
+MIDIMix.NoteTable = build_decode_table(
+    [(note, MIDIMix.RecArmButton, (i,)) for i, note in enumerate(MIDIMix.RecArmMapping)] +
+    [(note, MIDIMix.MuteButton, (i,)) for i, note in enumerate(MIDIMix.MuteMapping)] +
+    [(note, MIDIMix.BlankButton, (i,)) for i, note in enumerate(MIDIMix.BlankMapping)] +
+    [(note, MIDIMix.SoloButton, ()) for note in MIDIMix.SoloMapping]
+)
+MIDIMix.ControlTable = build_decode_table(
+    [(control, MIDIMix.Fader, (i,)) for i, control in enumerate(MIDIMix.FaderMapping)] +
+    [(control, MIDIMix.Knob, (x, y)) for x, column in enumerate(MIDIMix.KnobGridMapping) for y, control in enumerate(column)]
+)
+MIDIMix.LEDMessages = build_led_messages(MIDIMix.MuteMapping + MIDIMix.RecArmMapping + MIDIMix.BlankMapping, 2)
+MIDIMix.MessageCache = build_message_cache(MIDIMix.LEDMessages)
+MIDIMix.LEDColours = build_led_colours([
+    (MIDIMix.MuteMapping, MIDIMix.MuteColourValues),
+    (MIDIMix.RecArmMapping, MIDIMix.RecArmColourValues),
+    (MIDIMix.BlankMapping, MIDIMix.BlankColourValues)
+])
+MIDIMix.MirrorLayout = (
+    ("faders", "control", MIDIMix.FaderMapping, None),
+    ("knobs", "control", [control for column in MIDIMix.KnobGridMapping for control in column], (8, 3)),
+    ("mute", "note", MIDIMix.MuteMapping, None),
+    ("rec_arm", "note", MIDIMix.RecArmMapping, None),
+    ("blank", "note", MIDIMix.BlankMapping, None),
+    ("solo", "note", MIDIMix.SoloMapping, None),
+)
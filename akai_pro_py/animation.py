@@ -0,0 +1,164 @@
+import functools
+import threading
+import time
+
+from .APCmini import APCMini
+
+Font = {
+    "A": (0x7C, 0x12, 0x11, 0x12, 0x7C), "B": (0x7F, 0x49, 0x49, 0x49, 0x36), "C": (0x3E, 0x41, 0x41, 0x41, 0x22),
+    "D": (0x7F, 0x41, 0x41, 0x22, 0x1C), "E": (0x7F, 0x49, 0x49, 0x49, 0x41), "F": (0x7F, 0x09, 0x09, 0x09, 0x01),
+    "G": (0x3E, 0x41, 0x49, 0x49, 0x7A), "H": (0x7F, 0x08, 0x08, 0x08, 0x7F), "I": (0x00, 0x41, 0x7F, 0x41, 0x00),
+    "J": (0x20, 0x40, 0x41, 0x3F, 0x01), "K": (0x7F, 0x08, 0x14, 0x22, 0x41), "L": (0x7F, 0x40, 0x40, 0x40, 0x40),
+    "M": (0x7F, 0x02, 0x0C, 0x02, 0x7F), "N": (0x7F, 0x04, 0x08, 0x10, 0x7F), "O": (0x3E, 0x41, 0x41, 0x41, 0x3E),
+    "P": (0x7F, 0x09, 0x09, 0x09, 0x06), "Q": (0x3E, 0x41, 0x51, 0x21, 0x5E), "R": (0x7F, 0x09, 0x19, 0x29, 0x46),
+    "S": (0x46, 0x49, 0x49, 0x49, 0x31), "T": (0x01, 0x01, 0x7F, 0x01, 0x01), "U": (0x3F, 0x40, 0x40, 0x40, 0x3F),
+    "V": (0x1F, 0x20, 0x40, 0x20, 0x1F), "W": (0x3F, 0x40, 0x38, 0x40, 0x3F), "X": (0x63, 0x14, 0x08, 0x14, 0x63),
+    "Y": (0x07, 0x08, 0x70, 0x08, 0x07), "Z": (0x61, 0x51, 0x49, 0x45, 0x43), "0": (0x3E, 0x51, 0x49, 0x45, 0x3E),
+    "1": (0x00, 0x42, 0x7F, 0x40, 0x00), "2": (0x42, 0x61, 0x51, 0x49, 0x46), "3": (0x21, 0x41, 0x45, 0x4B, 0x31),
+    "4": (0x18, 0x14, 0x12, 0x7F, 0x10), "5": (0x27, 0x45, 0x45, 0x45, 0x39), "6": (0x3C, 0x4A, 0x49, 0x49, 0x30),
+    "7": (0x01, 0x71, 0x09, 0x05, 0x03), "8": (0x36, 0x49, 0x49, 0x49, 0x36), "9": (0x06, 0x49, 0x49, 0x29, 0x1E),
+    " ": (0x00, 0x00, 0x00, 0x00, 0x00), "!": (0x00, 0x00, 0x5F, 0x00, 0x00), ".": (0x00, 0x60, 0x60, 0x00, 0x00),
+    "-": (0x08, 0x08, 0x08, 0x08, 0x08), ":": (0x00, 0x36, 0x36, 0x00, 0x00), "?": (0x02, 0x01, 0x51, 0x09, 0x06),
+}  # 5x7 font, one byte per column with the top row in the lowest bit
+
+
+@functools.lru_cache(maxsize=64)
+def glyph_columns(text):
+    """Renders text once into a strip of 8 bit columns, the top row of the grid in the highest bit"""
+    columns = []
+    for character in text.upper():
+        for column in Font.get(character, Font["?"]):
+            columns.append(int(f"{column:07b}"[::-1], 2) << 1)  # Flip so the top font row lands on the top grid row
+        columns.append(0)  # Space between characters
+    return tuple(columns)
+
+
+class Layer:
+    """Something drawn onto the grid every frame, 0 is transparent so lower layers show through"""
+
+    def render(self, frame, t):
+        """Draws into frame, a bytearray of 64 colours indexed by grid note, t is seconds since the animation started"""
+        pass
+
+
+class ScrollingText(Layer):
+    def __init__(self, text, colour=APCMini.GridColours["green"], speed=8):
+        self.columns = glyph_columns(text + " ")
+        self.colour = colour
+        self.speed = speed  # Columns scrolled per second
+
+    def render(self, frame, t):
+        offset = int(t * self.speed)
+        for x in range(8):
+            column = self.columns[(offset + x) % len(self.columns)]
+            if column:
+                for y in range(8):
+                    if column >> y & 1:
+                        frame[APCMini.GridMapping[x][y]] = self.colour
+
+
+class Sprite(Layer):
+    def __init__(self, pixels, x=0, y=0, dx=0, dy=0):
+        """pixels is a list of rows from top to bottom, each a string of colour digits with "." for transparent"""
+        self.pixels = [(column, len(pixels) - 1 - row, int(colour)) for row, line in enumerate(pixels)
+                       for column, colour in enumerate(line) if colour != "."]
+        self.x, self.y = x, y
+        self.dx, self.dy = dx, dy  # Cells moved per second, the sprite wraps around the edges of the grid
+
+    def render(self, frame, t):
+        x = int(self.x + self.dx * t)
+        y = int(self.y + self.dy * t)
+        for column, row, colour in self.pixels:
+            frame[APCMini.GridMapping[(x + column) % 8][(y + row) % 8]] = colour
+
+
+class Wipe(Layer):
+    def __init__(self, colour=APCMini.GridColours["red"], duration=0.5, direction="right", start=0):
+        self.colour = colour
+        self.duration = duration  # Seconds to cover the whole grid
+        self.direction = direction  # "right", "left", "up" or "down"
+        self.start = start  # Seconds into the animation the wipe starts
+
+    def render(self, frame, t):
+        covered = min(8, int((t - self.start) / self.duration * 8) if t >= self.start else 0)
+        for i in range(covered):
+            line = i if self.direction in ("right", "up") else 7 - i
+            for j in range(8):
+                x, y = (line, j) if self.direction in ("right", "left") else (j, line)
+                frame[APCMini.GridMapping[x][y]] = self.colour
+
+
+class Overlay(Layer):
+    """Cells set directly, e.g. from button presses, drawn over the animation"""
+
+    def __init__(self):
+        self.cells = bytearray(64)
+
+    def set(self, x, y, colour):
+        self.cells[APCMini.GridMapping[x][y]] = colour
+
+    def render(self, frame, t):
+        for note, colour in enumerate(self.cells):
+            if colour:
+                frame[note] = colour
+
+
+class Animator:
+    """Renders layers onto an APC Mini's grid at a fixed frame rate from a background thread.
+    Each frame only sends the LEDs that changed, frames are dropped rather than queued when it falls behind"""
+
+    def __init__(self, controller, fps=30):
+        self.controller = controller
+        self.fps = fps
+        self.layers = []  # Drawn bottom to top
+        self.frames = 0  # Frames rendered
+        self.dropped = 0  # Frames skipped to catch up with the clock
+        self.running = False
+        self.thread = None
+
+    def add(self, layer):
+        self.layers = self.layers + [layer]
+        return layer
+
+    def remove(self, layer):
+        self.layers = [existing for existing in self.layers if existing is not layer]
+
+    def render(self, t):
+        """Draws every layer into a frame and flushes the grid LEDs that changed"""
+        frame = bytearray(64)
+        for layer in self.layers:
+            layer.render(frame, t)
+        framebuffer = self.controller.framebuffer
+        with framebuffer.lock:
+            framebuffer.drawn[0:64] = frame
+            framebuffer.flush()
+        self.frames += 1
+
+    def run(self):
+        period = 1 / self.fps
+        started = time.monotonic()
+        next_frame = started
+        while self.running:
+            delay = next_frame - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self.render(next_frame - started)
+            next_frame += period  # Ticks are scheduled from the start time, so sleeps do not drift
+            behind = time.monotonic() - next_frame
+            if behind > 0:  # Skip the frames that are already late instead of rendering them back to back
+                skipped = int(behind / period) + 1
+                self.dropped += skipped
+                next_frame += skipped * period
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            self.thread = threading.Thread(target=self.run, name=f"{self.controller.name} animation", daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
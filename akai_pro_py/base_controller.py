@@ -1,53 +1,628 @@
 import mido
+import mido.ports
 import asyncio
+import threading
+import time
 
 from . import errors
+from .pool import EventPool
+from .coalesce import Coalescer
+from .scheduler import OutputScheduler
+from .metrics import ControllerMetrics
+from .recording import Recorder, replay
+from .mirror import StateMirror
+from .workers import HandlerPool
+from .inputqueue import InputQueue
+from .gestures import GestureRecognizer
+from .ring import EventRing
+from .ledserver import LEDServer
+
+
+def build_decode_table(entries):
+    """Builds a 128 entry table mapping MIDI note or control numbers to (event class, event arguments)"""
+    table = [None] * 128
+    for number, event_class, args in entries:
+        if table[number] is None:  # Earlier entries take priority over later ones
+            table[number] = (event_class, args)
+    return table
+
+
+def build_led_messages(notes, colours):
+    """Precomputes the encoded note on message for every LED note and colour, indexed [note][colour]"""
+    table = [None] * 128
+    for note in notes:
+        table[note] = tuple(bytes((0x90, note, colour)) for colour in range(colours))
+    return table
+
+
+def build_led_colours(entries):
+    """Builds a table of the velocities every LED note accepts from (notes, colour values) pairs, where colour values
+    maps every valid colour to its velocity like the controllers' *ColourValues"""
+    table = [None] * 128
+    for notes, colour_values in entries:
+        for note in notes:
+            table[note] = frozenset(colour_values.values())
+    return table
+
+
+def build_message_cache(led_messages):
+    """Builds ready-to-send mido messages for every precomputed LED message, for ports that only take mido messages"""
+    return {data: mido.Message.from_bytes(data) for messages in led_messages if messages is not None
+            for data in messages}
+
+
+def decode(table, number, event_class):
+    """Returns the event arguments a note or control number decodes to, or None if it is not that kind of event"""
+    if isinstance(number, int) and 0 <= number < 128:
+        decoded = table[number]
+        if decoded is not None and decoded[0] is event_class:
+            return decoded[1]
+    return None
 
 
 class Controller:
-    def __init__(self, midi_in=None, midi_out=None):
-        self.midi_out = mido.open_output(midi_out)  # Open MIDI out for controller
-        self.midi_in = mido.open_input(midi_in)  # Open MIDI in for controller
-        self.setup_in_progress = True
-        self.midi_in.callback = self.on_midi_in  # Set callback function for incomming MIDI messages
+    DeviceEnquiry = [0xF0, 0x7E, 0x7F, 0x06, 0x01, 0xF7]  # MIDI Device Enquiry (SysEx)
+    NoteTable = [None] * 128  # Incoming note number to (event class, event arguments), built by each controller
+    ControlTable = [None] * 128  # Incoming control change number to (event class, event arguments)
+    LEDMessages = [None] * 128  # LED note to the encoded note on message for each colour, built by each controller
+    MessageCache = {}  # Encoded LED message to a ready-to-send mido message
+    LEDColours = [None] * 128  # LED note to the set of velocities it accepts, built by each controller
+    ManufacturerID = 71  # Manufacturer in the Device Enquiry reply (Akai)
+    ProductID = None  # Product in the Device Enquiry reply, any product if None
+    MirrorLayout = ()  # (name, "control" or "note", MIDI numbers, view shape or None) for each group in the mirror
+    Closed, Identifying, Ready, Failed = "closed", "identifying", "ready", "failed"  # Values of state
+
+    def __init__(self, midi_in=None, midi_out=None, lazy=False):
+        # midi_in and midi_out are port names to open, or ports that are already open.
+        # With lazy the ports are not opened and the controller not identified until open() or identify() is called
+        self.midi_in = midi_in
+        self.midi_out = midi_out
+        self.owns_ports = False  # The ports were opened by name here, so close() closes them
+        self.state = Controller.Closed
+        self.closed = False  # close() was called, writes no longer open the controller again
+        self.failure = None  # Why identifying the controller failed, raised by identify() and connect()
+        self.identified = threading.Event()  # Set when the controller identifies or identifying fails
         self.event_dispatch = None  # Defines the dispatch event to be none
         self.ready_dispatch = None
         self.raw_dispatch = False
-        self.loop = asyncio.new_event_loop()  # Creates the event loop for handling button presses
+        self.framebuffer = None  # LED framebuffer, set by controllers that have LEDs
+        self.output_lock = threading.Lock()  # Keeps batches of outgoing messages from interleaving
+        self.event_pool = None  # Preallocated read-only events, used instead of new events when set
+        self.coalescer = None  # Holds back fader and knob changes when coalescing is used
+        self.handler_pool = None  # Worker threads handlers run on when used, instead of the MIDI input thread
+        self.input_queue = None  # Bounded queue between the MIDI callback and dispatch when used
+        self.gestures = None  # Recognizes long presses, double taps, chords and drags when used
+        self.event_ring = None  # Shared memory ring button and control messages are published to when used
+        self.led_servers = []  # Running LEDServers that other processes set the LEDs through
+        self.output_pacing = 0  # Seconds to wait between messages of a batch, for devices that drop messages
+        self.output_scheduler = None  # Background writer for outgoing messages when used
+        self.metrics = ControllerMetrics()  # Counters and latency histograms, None to turn them off
+        self.last_received = 0  # time.monotonic_ns() when the last MIDI message arrived
+        self.mirror = StateMirror(self)  # Current state of every control, None to stop tracking it
+        self.recorder = None  # Writes every received message to a file while recording
+        self.input_sink = None  # Called with (controller, message, time received) instead of handling input inline
+        self._loop = None  # Event loop for coroutine handlers, created when first needed
+        self.event_streams = []  # (event loop, asyncio queue) for each running events() iterator
+        self.note_handlers = [None] * 128  # Note number to a tuple of handlers registered for that button
+        self.control_handlers = [None] * 128  # Control number to a tuple of handlers registered for that control
+        self.ready_waiters = []  # Futures of connect() calls waiting for the controller to identify
         self.name = "Base Controller"  # Name of the device
-        self.midi_out.send(mido.Message.from_bytes([0xF0, 0x7E, 0x7F, 0x06, 0x01, 0xF7]))  # MIDI Device Enquiry (SysEx)
+        if not lazy:
+            self.open()
+
+    @property
+    def loop(self):
+        """Event loop coroutine handlers run on, the controller's own loop unless connect() was awaited"""
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        return self._loop
+
+    @loop.setter
+    def loop(self, loop):
+        self._loop = loop
+
+    @property
+    def setup_in_progress(self):
+        return self.state != Controller.Ready
+
+    @setup_in_progress.setter
+    def setup_in_progress(self, value):
+        self.state = Controller.Identifying if value else Controller.Ready
+
+    def open(self):
+        """Opens the MIDI ports if needed and asks the controller to identify itself, without waiting for the reply.
+        Identifying starts again if it failed before"""
+        if self.state == Controller.Closed:
+            if not isinstance(self.midi_out, mido.ports.BaseOutput):
+                self.midi_out = mido.open_output(self.midi_out)  # Open MIDI out for controller
+                self.owns_ports = True
+            if not isinstance(self.midi_in, mido.ports.BaseInput):
+                self.midi_in = mido.open_input(self.midi_in)  # Open MIDI in for controller
+                self.owns_ports = True
+            self.closed = False
+        elif self.state != Controller.Failed:
+            return self  # Already identifying or ready
+        self.failure = None
+        self.identified.clear()
+        self.state = Controller.Identifying
+        self.midi_in.callback = self.on_midi_in  # Set callback function for incomming MIDI messages
+        self.send_device_enquiry()
+        return self
+
+    def identify(self, timeout=1, retries=2):
+        """Opens the controller if needed and waits for it to identify, asking again up to retries times.
+        Raises ControllerIdentificationError if it does not identify within timeout seconds of any attempt"""
+        self.open()
+        for attempt in range(retries + 1):
+            if attempt and self.state == Controller.Identifying:
+                self.send_device_enquiry()  # Ask again in case the enquiry or the reply was lost
+            if self.identified.wait(timeout):
+                break
+        if self.state == Controller.Identifying:
+            self.fail(errors.ControllerIdentificationError(
+                self, self.midi_in, f"Controller did not identify after {retries + 1} attempts!"))
+        if self.state == Controller.Failed:
+            raise self.failure
+        return self
+
+    def fail(self, error):
+        """Marks identifying the controller as failed, waking up anything waiting for it"""
+        self.failure = error
+        self.state = Controller.Failed
+        self.identified.set()
+        for future in self.ready_waiters:
+            future.get_loop().call_soon_threadsafe(self.resolve_waiter, future)
+
+    def close(self):
+        """Stops every LED server, input queue, worker and shared memory ring, sends any output still queued and closes
+        the MIDI ports that were opened by name"""
+        self.stop_serving_leds()  # First, so nothing else draws on the controller while it closes
+        self.use_input_queue(False)  # Everything queued is handled before the rest shuts down
+        self.use_coalescing(False)
+        self.use_gestures(False)
+        self.use_handler_pool(False)
+        self.stop_publishing()
+        self.stop_output_scheduler()
+        self.stop_recording()
+        if self.state != Controller.Closed:
+            self.midi_in.callback = None
+            if self.owns_ports:
+                self.midi_in.close()
+                self.midi_out.close()
+                self.midi_in, self.midi_out = self.midi_in.name, self.midi_out.name  # open() opens them again
+                self.owns_ports = False
+            self.state = Controller.Closed
+        self.closed = True
+
+    def send_device_enquiry(self):
+        """Asks the controller to identify itself, the reply is checked by product_detect"""
+        with self.output_lock:
+            self.midi_out.send(mido.Message.from_bytes(self.DeviceEnquiry))
 
     def on_event(self, func):
-        """Used to dispatch MIDI events from the controller"""
+        """Used to dispatch MIDI events from the controller, can be a normal or coroutine function"""
         if self.event_dispatch is not None:
             raise errors.AkaiProPyError("Event dispatch function is already defined!")
         self.event_dispatch = func
+        return func
 
     def on_ready(self, func):
         if self.ready_dispatch is not None:
             raise errors.AkaiProPyError("Ready event function already defined!")
         self.ready_dispatch = func
+        return func
 
-    def on_midi_in(self, event):
-        if self.setup_in_progress:
-            product_detect_success = self.product_detect(event)
-            if product_detect_success and self.ready_dispatch is not None:
-                self.ready_dispatch()
+    def call_handler(self, func, *args):
+        """Calls a handler, coroutine functions are scheduled on the controller's event loop instead"""
+        if asyncio.iscoroutinefunction(func):
+            asyncio.run_coroutine_threadsafe(func(*args), self.loop)
         else:
+            func(*args)
+
+    def on_midi_in(self, event):
+        received = time.monotonic_ns()
+        if self.metrics is not None:
+            self.metrics.messages_in += 1
+        if self.recorder is not None:
+            self.recorder.record(received, event)
+        if self.input_sink is not None:
+            self.input_sink(self, event, received)
+            return
+        self.last_received = received
+        self.handle_midi_in(event)
+
+    def handle_midi_in(self, event):
+        """Identifies the controller from its Device Enquiry reply, then dispatches events"""
+        if self.state == Controller.Ready:
             self.pre_event_dispatch(event)
+        elif self.state == Controller.Identifying and event.type == "sysex" and event.data[2:4] == (0x06, 0x02):
+            try:
+                self.product_detect(event)
+            except errors.ControllerIdentificationError as error:
+                self.fail(error)
+                return
+            self.state = Controller.Ready
+            self.identified.set()
+            for future in self.ready_waiters:
+                future.get_loop().call_soon_threadsafe(self.resolve_waiter, future)
+            if self.ready_dispatch is not None:
+                self.call_handler(self.ready_dispatch)
+        else:
+            self.drop()  # Nothing is dispatched until the controller has identified
+
+    @staticmethod
+    def resolve_waiter(future):
+        if not future.done():
+            future.set_result(True)
+
+    async def connect(self, timeout=5, retries=0):
+        """Waits until the controller has identified itself, coroutine handlers then run on the calling event loop.
+        Opens the controller if needed and asks again up to retries times, each attempt waiting timeout seconds"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not None and self._loop is not loop and not self._loop.is_running():
+            self._loop.close()  # The controller's own loop is no longer needed
+        self.loop = loop
+        self.open()
+        future = self.loop.create_future()
+        self.ready_waiters.append(future)
+        try:
+            for attempt in range(retries + 1):
+                if self.state != Controller.Identifying:  # Identified or failed while the waiter was being added
+                    break
+                self.send_device_enquiry()  # Ask again in case the reply to the first enquiry was missed
+                try:
+                    await asyncio.wait_for(asyncio.shield(future), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            if self.state == Controller.Identifying:
+                self.fail(errors.ControllerIdentificationError(self, self.midi_in, "Controller did not identify in time!"))
+        finally:
+            self.ready_waiters.remove(future)
+        if self.state == Controller.Failed:
+            raise self.failure
+        return self
+
+    async def events(self):
+        """Asynchronous iterator of every event from the controller, used with async for"""
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        stream = (loop, queue)
+        self.event_streams.append(stream)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.event_streams.remove(stream)
+
+    def add_handler(self, func, notes=(), controls=()):
+        """Registers a function for events from the buttons (notes) and faders/knobs (controls) given"""
+        for note in notes:
+            self.note_handlers[note] = (self.note_handlers[note] or ()) + (func,)
+        for control in controls:
+            self.control_handlers[control] = (self.control_handlers[control] or ()) + (func,)
+        return func
+
+    def remove_handler(self, func):
+        """Unregisters a function from every button and control it was registered for"""
+        for table in (self.note_handlers, self.control_handlers):
+            for number, handlers in enumerate(table):
+                if handlers is not None and func in handlers:
+                    table[number] = tuple(handler for handler in handlers if handler is not func) or None
+
+    def handler_decorator(self, notes=(), controls=()):
+        """Returns a decorator that registers a function with add_handler"""
+        def decorator(func):
+            return self.add_handler(func, notes, controls)
+        return decorator
+
+    @staticmethod
+    def select(mapping, wanted):
+        """Returns the MIDI numbers of a mapping at the index wanted, or all of them if wanted is None"""
+        return [number for i, number in enumerate(mapping) if wanted is None or wanted == i]
+
+    def dispatch(self, event, handlers=None, received=None, key=None):
+        """Hands a decoded event to the on_event function, every events() iterator and the handlers given.
+        received is the time.monotonic_ns() the message arrived at, the last message received if None.
+        With a handler pool, events with the same key are handled in order and None is one shared key"""
+        if self.handler_pool is not None:
+            self.handler_pool.submit(key, event, handlers, self.last_received if received is None else received)
+        else:
+            self.run_handlers(event, handlers, received)
+
+    def run_handlers(self, event, handlers=None, received=None):
+        """Calls the handlers of an event on the calling thread"""
+        metrics = self.metrics
+        if metrics is not None:
+            start = time.monotonic_ns()
+            metrics.dispatch_latency.record(start - (self.last_received if received is None else received))
+        try:
+            if self.event_dispatch is not None:
+                self.call_handler(self.event_dispatch, event)
+            for loop, queue in self.event_streams:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            if handlers is not None:
+                for handler in handlers:
+                    self.call_handler(handler, event)
+        except Exception:
+            if metrics is not None:
+                metrics.errors += 1
+            raise
+        finally:
+            if metrics is not None:
+                metrics.dispatched += 1
+                metrics.handler_time.record(time.monotonic_ns() - start)
+
+    def stats(self):
+        """Returns a snapshot of the controller's counters and latency percentiles"""
+        if self.metrics is None:
+            return {}
+        return self.metrics.snapshot()
+
+    def reset_stats(self):
+        """Zeroes the controller's counters and latency histograms"""
+        if self.metrics is not None:
+            self.metrics.reset()
+
+    def drop(self):
+        """Counts a message that was not dispatched"""
+        if self.metrics is not None:
+            self.metrics.dropped += 1
+
+    @classmethod
+    def is_identity(cls, event):
+        """Returns whether a message is the Device Enquiry reply of this kind of controller"""
+        data = getattr(event, "data", ())
+        return (len(data) > 5 and data[2] == 0x06 and data[3] == 0x02 and data[4] == cls.ManufacturerID and
+                cls.ProductID in (None, data[5]))
 
     def product_detect(self, event):
+        """Checks the Device Enquiry reply is from this kind of controller, raises ControllerIdentificationError if not"""
         try:
-            if event.data[4] != 6:
+            if event.data[2] != 6:
                 raise errors.ControllerIdentificationError(self, self.midi_in, "Controller did not identify!")
-        except KeyError:
-            raise errors.ControllerIdentificationError(self, self.midi_in, "Controller failed to identify!")
+
+            if event.data[4] != self.ManufacturerID:
+                raise errors.ControllerIdentificationError(self, self.midi_in, "MIDI device is not an Akai device!")
+
+            if self.ProductID is not None and event.data[5] != self.ProductID:
+                raise errors.ControllerIdentificationError(self, self.midi_in, f"MIDI device is not an {self.name}")
+        except (AttributeError, IndexError):
+            raise errors.ControllerIdentificationError(self, self.midi_in, "MIDI device failed to identify")
         self.setup_in_progress = False
         return True
 
+    def use_event_pool(self, enabled=True):
+        """Reuses preallocated read-only events for every control and state instead of creating new ones"""
+        self.event_pool = EventPool(self) if enabled else None
+
+    def use_coalescing(self, enabled=True, window=0.02):
+        """Only dispatches the latest value of each fader and knob, gathered over a window in seconds.
+        With a window of None changes are held until dispatch_pending() is called, e.g. once per UI redraw"""
+        if self.coalescer is not None:
+            self.coalescer.close()
+        self.coalescer = Coalescer(self, window) if enabled else None
+
+    def use_handler_pool(self, enabled=True, workers=4):
+        """Runs handlers on up to workers threads instead of the MIDI input thread, so slow handlers do not hold up
+        input. Events from the same button or control are still handled one at a time, in order"""
+        if self.handler_pool is not None:
+            pool, self.handler_pool = self.handler_pool, None
+            pool.close()
+        self.handler_pool = HandlerPool(self, workers) if enabled else None
+
+    def use_input_queue(self, enabled=True, size=256, policy="block"):
+        """Handles input on a separate thread through a queue of at most size messages, so memory use and latency stay
+        bounded when handlers fall behind. policy is what happens when the queue is full, see InputQueue"""
+        if self.input_queue is not None:
+            queue, self.input_queue = self.input_queue, None
+            self.input_sink = None
+            queue.close()
+        if enabled:
+            self.input_queue = InputQueue(self, size, policy)
+            self.input_sink = self.input_queue.put
+
+    def use_gestures(self, enabled=True, long_press=0.5, double_tap=0.3, chord_window=0.08):
+        """Recognizes gestures made with the buttons, returns the recognizer to register gesture handlers with.
+        Times are in seconds, see GestureRecognizer"""
+        if self.gestures is not None:
+            self.gestures.close()
+        self.gestures = GestureRecognizer(self, long_press, double_tap, chord_window) if enabled else None
+        return self.gestures
+
+    def dispatch_pending(self):
+        """Dispatches the fader and knob changes held back by coalescing, returns how many were dispatched"""
+        if self.coalescer is None:
+            return 0
+        return self.coalescer.flush()
+
+    def decode_control(self, control, value):
+        """Returns the event for a control change, or None if it is not a fader or knob on this controller"""
+        if self.event_pool is not None:
+            return self.event_pool.control(control, value)
+        decoded = self.ControlTable[control]
+        if decoded is not None:
+            return decoded[0](self, *decoded[1], value)
+        return None
+
+    def decode_note(self, note, state):
+        """Returns the event for a button changing state, or None if it is not a button on this controller"""
+        if self.event_pool is not None:
+            return self.event_pool.note(note, state)
+        decoded = self.NoteTable[note]
+        if decoded is not None:
+            return decoded[0](self, *decoded[1], state)
+        return None
+
+    def decode_event(self, event):
+        """Turns an incoming MIDI message into an event, or None if it is not a control on this controller"""
+        if event.type == "control_change":  # Event is a fader or knob change
+            return self.decode_control(event.control, event.value)
+        elif event.type == "note_on" or event.type == "note_off":  # Event is a button press
+            return self.decode_note(event.note, event.type == "note_on")
+        return None
+
     def pre_event_dispatch(self, event):
-        if self.event_dispatch is None:
-            return  # Ignore if a dispatch event is not set with the on_event decorator
+        listening = self.event_dispatch is not None or self.event_streams
+        mirror = self.mirror
+
+        if event.type == "control_change":  # Event is a fader or knob change
+            if mirror is not None:  # Same as mirror.control(), inlined as it runs for every message
+                slot = mirror.control_slots[event.control]
+                if slot is not None:
+                    mirror.controls[slot] = event.value
+            if self.event_ring is not None and self.ControlTable[event.control] is not None:
+                self.event_ring.publish(0xB0, event.control, event.value)
+            handlers = self.control_handlers[event.control]
+            if handlers is None and not listening:
+                self.drop()
+                return  # Ignore controls nothing is listening to before creating an event
+            if self.coalescer is not None:
+                self.coalescer.hold(event.control, event.value, self.last_received)
+                return
+            decoded = self.decode_control(event.control, event.value)
+            key = event.control
+
+        elif event.type == "note_on" or event.type == "note_off":  # Event is a button press
+            if mirror is not None:
+                mirror.note(event.note, event.type == "note_on")
+            if self.event_ring is not None and self.NoteTable[event.note] is not None:
+                self.event_ring.publish(0x90 if event.type == "note_on" else 0x80, event.note, event.velocity)
+            handlers = self.note_handlers[event.note]
+            if handlers is None and not listening:
+                self.drop()
+                return  # Ignore buttons nothing is listening to before creating an event
+            decoded = self.decode_note(event.note, event.type == "note_on")
+            key = 128 + event.note  # Kept apart from control numbers
+
+        else:
+            self.drop()
+            return
+
+        if decoded is not None:
+            self.dispatch(decoded, handlers, key=key)
+        else:
+            self.drop()
+
+    def start_recording(self, path):
+        """Records every MIDI message received from the controller to a file, with the time it arrived"""
+        self.stop_recording()
+        self.recorder = Recorder(self, path)
+        return self.recorder
+
+    def stop_recording(self):
+        """Writes any messages still queued and closes the recording"""
+        if self.recorder is not None:
+            recorder, self.recorder = self.recorder, None
+            recorder.close()
+
+    def replay(self, path, speed=1.0):
+        """Dispatches the messages of a recording as if they came from the controller, returns how many were replayed.
+        speed scales the recorded timing, None or 0 replays as fast as possible"""
+        return replay(self, path, speed)
+
+    def start_publishing(self, name=None, capacity=4096):
+        """Publishes every button and control message to a shared memory ring that other processes can follow with
+        EventRingReader(ring.name). capacity is how many messages the ring holds before overwriting the oldest"""
+        self.stop_publishing()
+        self.event_ring = EventRing(self, name, capacity)
+        return self.event_ring
+
+    def stop_publishing(self):
+        """Removes the shared memory ring"""
+        if self.event_ring is not None:
+            ring, self.event_ring = self.event_ring, None
+            ring.close()
+
+    def serve_leds(self, address):
+        """Lets other processes set the LEDs through an LEDClient, address is a Unix socket path or (host, port).
+        Returns the running LEDServer, stopped by close() if it was not stopped before"""
+        return LEDServer(self, address).start()
+
+    def stop_serving_leds(self):
+        """Stops every LEDServer of the controller"""
+        for server in list(self.led_servers):
+            server.stop()
+
+    def start_output_scheduler(self, rate=None):
+        """Sends outgoing messages from a background thread, limited to rate messages per second if given"""
+        self.stop_output_scheduler()
+        self.output_scheduler = OutputScheduler(self, rate)
+
+    def stop_output_scheduler(self):
+        """Sends anything still queued then goes back to sending on the calling thread"""
+        if self.output_scheduler is not None:
+            scheduler, self.output_scheduler = self.output_scheduler, None
+            scheduler.close()
+
+    def send_bytes(self, data):
+        """Sends a contiguous stream of 3 byte MIDI messages to the controller as one batch"""
+        if self.output_scheduler is not None:
+            self.output_scheduler.put(data)
+        else:
+            self.write_bytes(data)
+
+    def write_message(self, message):
+        """Writes one encoded 3 byte message, rtmidi ports take the bytes as they are"""
+        rtmidi_port = getattr(self.midi_out, "_rt", None)
+        if rtmidi_port is not None:
+            rtmidi_port.send_message(message)
+        else:
+            cached = self.MessageCache.get(message)
+            self.midi_out.send(cached if cached is not None else mido.Message.from_bytes(message))
+
+    def write_bytes(self, data):
+        """Writes a stream of 3 byte MIDI messages to the MIDI port, one writer at a time"""
+        if self.state == Controller.Closed:
+            if self.closed:
+                raise errors.AkaiProPyError(f"{self.name} is closed, open() it again before sending to it")
+            self.open()  # Lazily created controllers open on their first write
+        data = bytes(data)
+        metrics = self.metrics
+        with self.output_lock:
+            for i in range(0, len(data), 3):
+                if metrics is not None:
+                    start = time.monotonic_ns()
+                    self.write_message(data[i:i + 3])
+                    metrics.send_time.record(time.monotonic_ns() - start)
+                    metrics.messages_out += 1
+                else:
+                    self.write_message(data[i:i + 3])
+                if self.output_pacing:
+                    time.sleep(self.output_pacing)
+
+    def flush(self):
+        """Sends all LEDs drawn into the framebuffer that changed since the last flush"""
+        if self.framebuffer is None:
+            return 0
+        return self.framebuffer.flush()
+
+    def define_page(self, name, leds):
+        """Stores a named LED page from an iterable of (note, colour), to be shown later with show_page"""
+        self.framebuffer.define_page(name, leds)
+
+    def save_page(self, name):
+        """Stores the LEDs drawn so far as a named page"""
+        self.framebuffer.save_page(name)
+
+    def page(self, name):
+        """Context manager that stores everything the calling thread draws inside it as a named page without showing it"""
+        return self.framebuffer.page(name)
+
+    def show_page(self, name):
+        """Shows a stored page, only sending the LEDs that change, in one batch. Returns how many were sent"""
+        return self.framebuffer.show_page(name)
+
+    def clear(self):
+        """Turns off every LED that is not already off, in one batch"""
+        if self.framebuffer is not None:
+            self.framebuffer.fill(0)
+            self.framebuffer.flush()
+
+    def reset(self):
+        """Turns off all LEDs, resending every one in case the device state is unknown"""
+        if self.framebuffer is not None:
+            self.framebuffer.invalidate()
+            self.clear()
 
     def start(self):
         """Start the event loop for receiving MIDI messages"""
@@ -0,0 +1,159 @@
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import mido
+
+from .APCmini import APCMini
+from .MIDIMix import MIDIMix
+from .ports import MemoryInput, MemoryOutput
+from .simulator import VirtualAPCMini, VirtualMIDIMix
+
+IdentityReplies = {
+    APCMini: VirtualAPCMini.identity_reply(),
+    MIDIMix: VirtualMIDIMix.identity_reply(),
+}  # Identity replies that product_detect accepts for each controller
+
+
+def make_controller(controller_class):
+    """Creates an identified controller on in-memory ports that discard everything sent to them"""
+    midi_in = MemoryInput("bench in")
+    controller = controller_class(midi_in, MemoryOutput("bench out", sink=lambda msg: None))
+    midi_in.feed(IdentityReplies[controller_class])
+    return controller
+
+
+def input_messages(controller_class):
+    """Returns a realistic mix of fader/knob moves and button presses for a controller"""
+    messages = []
+    for value in range(128):
+        for control, decoded in enumerate(controller_class.ControlTable):
+            if decoded is not None:
+                messages.append(mido.Message("control_change", control=control, value=value))
+    for note, decoded in enumerate(controller_class.NoteTable):
+        if decoded is not None:
+            messages.append(mido.Message("note_on", note=note, velocity=127))
+            messages.append(mido.Message("note_off", note=note, velocity=0))
+    return messages
+
+
+def input_benchmark(controller_class):
+    controller = make_controller(controller_class)
+    controller.on_event(lambda event: None)
+    messages = input_messages(controller_class)
+    return lambda i: controller.pre_event_dispatch(messages[i % len(messages)])
+
+
+def apc_set_led_benchmark():
+    apc = make_controller(APCMini)
+    return lambda i: apc.gridbuttons.set_led(i % 8, (i // 8) % 8, (i // 64) % 7)  # Every call changes a colour
+
+
+def mix_set_led_benchmark():
+    mix = make_controller(MIDIMix)
+    return lambda i: mix.mutebuttons.set_led(i % 8, (i // 8) % 2)
+
+
+def reset_benchmark(controller_class):
+    controller = make_controller(controller_class)
+    return lambda i: controller.reset()
+
+
+Benchmarks = {
+    "apc_mini_input": lambda: input_benchmark(APCMini),
+    "midi_mix_input": lambda: input_benchmark(MIDIMix),
+    "apc_mini_set_led": apc_set_led_benchmark,
+    "midi_mix_set_led": mix_set_led_benchmark,
+    "apc_mini_reset": lambda: reset_benchmark(APCMini),
+    "midi_mix_reset": lambda: reset_benchmark(MIDIMix),
+}  # Benchmark name to a function that sets up a controller and returns the operation to time
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run_benchmark(setup, iterations):
+    """Times an operation, returns its throughput, latency percentiles and allocations per call"""
+    operation = setup()
+    for i in range(min(iterations, 1000)):  # Warm up
+        operation(i)
+
+    timings = [0] * iterations
+    clock = time.perf_counter_ns
+    start = clock()
+    for i in range(iterations):
+        before = clock()
+        operation(i)
+        timings[i] = clock() - before
+    total = clock() - start
+    timings.sort()
+
+    samples = min(iterations, 1000)
+    allocated = 0
+    tracemalloc.start()
+    for i in range(samples):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        operation(i)
+        allocated += tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+
+    blocks_before = sys.getallocatedblocks()
+    for i in range(samples):
+        operation(i)
+    retained_blocks = sys.getallocatedblocks() - blocks_before
+
+    return {
+        "iterations": iterations,
+        "ops_per_sec": iterations / (total / 1e9),
+        "p50_us": percentile(timings, 0.50) / 1000,
+        "p90_us": percentile(timings, 0.90) / 1000,
+        "p99_us": percentile(timings, 0.99) / 1000,
+        "max_us": timings[-1] / 1000,
+        "peak_bytes_per_op": allocated / samples,
+        "retained_blocks_per_op": retained_blocks / samples,
+    }
+
+
+def run(names=None, iterations=20000):
+    """Runs the benchmarks named, or all of them, returning the results as a dict"""
+    results = {}
+    for name in names or Benchmarks:
+        iterations_for = iterations if not name.endswith("_reset") else max(1, iterations // 100)
+        results[name] = run_benchmark(Benchmarks[name], iterations_for)
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "time": time.time(),
+        "results": results,
+    }
+
+
+def report(results, baseline=None):
+    """Formats results as a table, with the change in throughput against a baseline run if given"""
+    lines = [f"{'benchmark':<18} {'ops/sec':>12} {'p50 us':>9} {'p99 us':>9} {'max us':>9} {'bytes/op':>9}"]
+    for name, result in results["results"].items():
+        line = (f"{name:<18} {result['ops_per_sec']:>12.0f} {result['p50_us']:>9.2f} {result['p99_us']:>9.2f} "
+                f"{result['max_us']:>9.2f} {result['peak_bytes_per_op']:>9.0f}")
+        if baseline is not None and name in baseline["results"]:
+            change = result["ops_per_sec"] / baseline["results"][name]["ops_per_sec"] - 1
+            line += f" {change:>+8.1%}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(args):
+    """Entry point of the bench command"""
+    results = run(args.benchmarks, args.iterations)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+    print(report(results, baseline))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
@@ -0,0 +1,25 @@
+import argparse
+
+
+def main(argv=None):
+    """Entry point of the akai-pro-py command"""
+    parser = argparse.ArgumentParser(prog="akai-pro-py", description="Tools for Akai Professional MIDI controllers")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    bench = commands.add_parser("bench", help="Benchmark the input and output paths against in-memory ports")
+    bench.add_argument("benchmarks", nargs="*", help="Benchmarks to run, all of them if none are given")
+    bench.add_argument("-n", "--iterations", type=int, default=20000, help="Calls timed per benchmark")
+    bench.add_argument("-o", "--output", help="Write the results to this JSON file")
+    bench.add_argument("-c", "--compare", help="Compare throughput against the results in this JSON file")
+
+    args = parser.parse_args(argv)
+    if args.command == "bench":
+        from . import bench as bench_module
+        unknown = set(args.benchmarks) - set(bench_module.Benchmarks)
+        if unknown:
+            parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+        bench_module.main(args)
+
+
+if __name__ == "__main__":
+    main()
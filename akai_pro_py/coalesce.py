@@ -0,0 +1,50 @@
+import threading
+import time
+
+
+class Coalescer:
+    """Holds back fader and knob changes so only the latest value of each control is dispatched"""
+
+    def __init__(self, controller, window=None):
+        self.controller = controller
+        self.window = window  # Seconds to gather changes for, None to wait for dispatch_pending() calls
+        self.pending = {}  # Control number to its (latest value, time received), in the order the controls changed
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()  # Set when changes are waiting for the window to close
+        self.thread = None
+        self.closed = False
+
+    def hold(self, control, value, received=None):
+        """Records the latest value of a control, to be dispatched when the window closes"""
+        with self.lock:
+            self.pending[control] = (value, received)
+        if self.window is not None and not self.wakeup.is_set():
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name=f"{self.controller.name} coalescer", daemon=True)
+                self.thread.start()
+            self.wakeup.set()
+
+    def run(self):
+        while True:
+            self.wakeup.wait()
+            if self.closed:
+                return
+            time.sleep(self.window)
+            self.flush()
+
+    def close(self):
+        """Dispatches anything still held back and stops the window thread"""
+        self.closed = True
+        self.flush()
+        self.wakeup.set()
+
+    def flush(self):
+        """Dispatches the latest value of every control that changed, returns how many were dispatched"""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            self.wakeup.clear()
+        for control, (value, received) in pending.items():
+            decoded = self.controller.decode_control(control, value)
+            if decoded is not None:
+                self.controller.dispatch(decoded, self.controller.control_handlers[control], received, control)
+        return len(pending)
@@ -4,4 +4,5 @@ import time
 
 from .base_controller import Controller
 from .MIDIMix import MIDIMix
-from .APCmini import APCMini
\ No newline at end of file
+from .APCmini import APCMini
+from .discovery import discover
\ No newline at end of file
@@ -0,0 +1,79 @@
+import concurrent.futures
+import queue
+import time
+
+import mido
+
+from .APCmini import APCMini
+from .MIDIMix import MIDIMix
+from .base_controller import Controller
+
+ControllerClasses = (APCMini, MIDIMix)  # Controllers discover() looks for by default
+
+
+def open_port(opener, name):
+    """Opens a port, returning None if it cannot be opened, e.g. because another program has it open"""
+    try:
+        return opener(name)
+    except Exception:  # Each backend raises its own error types
+        return None
+
+
+def discover(timeout=1, controller_classes=ControllerClasses, backend=mido):
+    """Finds every attached controller and returns them ready to use, in port order.
+    The Device Enquiry is sent to every MIDI output at once and replies are collected until timeout seconds pass
+    or every input has answered. A controller's input and output ports have the same name on every mido backend.
+    backend is mido or a mido.Backend to look for ports on"""
+    deadline = time.monotonic() + timeout
+    input_names = backend.get_input_names()
+    output_names = backend.get_output_names()
+    replies = queue.SimpleQueue()  # (input name, Device Enquiry reply) in the order they arrive
+
+    def listen(name):
+        def callback(msg):
+            if msg.type == "sysex":
+                replies.put((name, msg))
+        return callback
+
+    with concurrent.futures.ThreadPoolExecutor(max(1, len(input_names) + len(output_names))) as executor:
+        inputs = dict(zip(input_names, executor.map(lambda name: open_port(backend.open_input, name), input_names)))
+        for name, port in inputs.items():
+            if port is not None:
+                port.callback = listen(name)
+
+        def enquire(name):
+            port = open_port(backend.open_output, name)
+            if port is not None:
+                port.send(mido.Message.from_bytes(Controller.DeviceEnquiry))
+            return port
+
+        outputs = dict(zip(output_names, executor.map(enquire, output_names)))
+
+    found = {}  # Input name to (controller class, identity reply)
+    answered = set()  # Inputs that replied, whether or not they are a controller
+    waiting = sum(port is not None for port in inputs.values())
+    while len(answered) < waiting:
+        try:
+            name, reply = replies.get(timeout=max(0, deadline - time.monotonic()))
+        except queue.Empty:
+            break
+        answered.add(name)
+        for controller_class in controller_classes:
+            if name not in found and controller_class.is_identity(reply):
+                found[name] = (controller_class, reply)
+
+    controllers = []
+    for name in input_names:
+        if name not in found or outputs.get(name) is None:
+            continue  # Not a controller, or no output of the same name to send to it on
+        controller_class, reply = found[name]
+        controller = controller_class(inputs.pop(name), outputs.pop(name), lazy=True)
+        controller.owns_ports = True
+        controller.open()
+        controller.handle_midi_in(reply)  # Identified already, the reply to the enquiry open() sends is ignored
+        controllers.append(controller)
+
+    for port in list(inputs.values()) + list(outputs.values()):
+        if port is not None:
+            port.close()
+    return controllers
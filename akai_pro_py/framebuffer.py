@@ -0,0 +1,120 @@
+import contextlib
+import threading
+
+UNKNOWN = 0xFF  # Colour value for an LED whose state on the device is not known
+NOTE_ON = 0x90  # Status byte of a note on message on channel 1
+
+
+class Framebuffer:
+    """In-memory copy of a controller's LEDs, draw into it freely and flush() to send only the changes"""
+
+    def __init__(self, controller, notes):
+        self.controller = controller
+        self.notes = sorted(set(notes))  # MIDI notes that have an LED on this controller
+        self.drawn = bytearray(128)  # Colours callers have drawn, indexed by MIDI note
+        self.shown = bytearray([UNKNOWN]) * 128  # Colours the device is currently showing, indexed by MIDI note
+        self.lock = threading.RLock()
+        self.pages = {}  # Page name to the colour of every note in self.notes, in order
+        self.building = threading.local()  # .page is the page a thread is drawing with page(), only it sees it
+
+    def canvas(self):
+        """Returns the colours the calling thread draws into, its page while inside page(), otherwise self.drawn"""
+        page = getattr(self.building, "page", None)
+        return self.drawn if page is None else page
+
+    def draw(self, note, colour):
+        """Draws a colour into the framebuffer without sending anything"""
+        self.canvas()[note] = colour
+
+    def set(self, note, colour):
+        """Draws a colour and sends it straight away if the device is not already showing it"""
+        page = getattr(self.building, "page", None)
+        if page is not None:
+            page[note] = colour
+            return
+        with self.lock:
+            self.drawn[note] = colour
+            if self.shown[note] != colour:
+                self.controller.send_bytes(self.message(note, colour))
+                self.shown[note] = colour
+
+    def get(self, note):
+        """Returns the colour drawn for a note"""
+        return self.canvas()[note]
+
+    def changed(self):
+        """Returns the notes whose drawn colour differs from what the device is showing"""
+        drawn, shown = self.drawn, self.shown
+        return [note for note in self.notes if drawn[note] != shown[note]]
+
+    def fill(self, colour, notes=None):
+        """Draws a colour into every LED, or only the notes given"""
+        drawn = self.canvas()
+        for note in self.notes if notes is None else notes:
+            drawn[note] = colour
+
+    def message(self, note, colour):
+        """Returns the encoded note on message that sets a note to a colour, precomputed for valid colours"""
+        messages = self.controller.LEDMessages[note]
+        if messages is not None and colour < len(messages):
+            return messages[colour]
+        return bytes((NOTE_ON, note, colour))
+
+    def encode(self, notes, colours):
+        """Encodes a colour for each of the notes given as one contiguous stream of note on messages"""
+        return b"".join([self.message(note, colour) for note, colour in zip(notes, colours)])
+
+    def flush(self):
+        """Sends every LED that changed since the last flush as one batch, returns how many were sent"""
+        if getattr(self.building, "page", None) is not None:
+            return 0
+        with self.lock:
+            changed = self.changed()
+            if changed:
+                # draw() and fill() do not take the lock, so send and record one snapshot of the colours: anything
+                # drawn during the send still differs from shown and goes out with the next flush
+                drawn = self.drawn
+                colours = [drawn[note] for note in changed]
+                self.controller.send_bytes(self.encode(changed, colours))
+                shown = self.shown
+                for note, colour in zip(changed, colours):
+                    shown[note] = colour
+        return len(changed)
+
+    def invalidate(self):
+        """Forgets what the device is showing so the next flush resends every LED"""
+        with self.lock:
+            for note in self.notes:
+                self.shown[note] = UNKNOWN
+
+    def define_page(self, name, leds):
+        """Stores a page from an iterable of (note, colour), notes not given are off"""
+        colours = dict(leds)
+        self.pages[name] = bytes(colours.get(note, 0) for note in self.notes)
+
+    def save_page(self, name):
+        """Stores everything drawn so far as a page"""
+        with self.lock:
+            drawn = self.canvas()
+            self.pages[name] = bytes(drawn[note] for note in self.notes)
+
+    @contextlib.contextmanager
+    def page(self, name):
+        """Draws a page without showing it: draws by the calling thread inside the with block go to a blank page that
+        is stored on exit. Other threads keep drawing to and flushing the LEDs as usual"""
+        outer = getattr(self.building, "page", None)
+        self.building.page = bytearray(128)
+        try:
+            yield self
+            self.save_page(name)
+        finally:
+            self.building.page = outer
+
+    def show_page(self, name):
+        """Draws a stored page and sends the LEDs that differ from what is shown as one batch, returns how many"""
+        page = self.pages[name]
+        with self.lock:
+            drawn = self.canvas()
+            for note, colour in zip(self.notes, page):
+                drawn[note] = colour
+            return self.flush()
@@ -0,0 +1,203 @@
+import functools
+import heapq
+import itertools
+import threading
+import time
+import traceback
+
+
+class Timer:
+    """One thread that runs every scheduled callback, shared by all gesture recognizers"""
+
+    def __init__(self):
+        self.heap = []  # (deadline, sequence, callback, args), earliest first
+        self.sequence = itertools.count()  # Keeps callbacks with the same deadline in the order they were scheduled
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self.run, name="Gesture timer", daemon=True)
+        self.thread.start()
+
+    def schedule(self, delay, callback, *args):
+        """Calls callback(*args) on the timer thread after delay seconds"""
+        entry = (time.monotonic() + delay, next(self.sequence), callback, args)
+        with self.condition:
+            heapq.heappush(self.heap, entry)
+            if self.heap[0] is entry:  # The new callback is the next one due, wake the thread to wait for it instead
+                self.condition.notify()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.heap or self.heap[0][0] > time.monotonic():
+                    self.condition.wait(self.heap[0][0] - time.monotonic() if self.heap else None)
+                deadline, sequence, callback, args = heapq.heappop(self.heap)
+            try:
+                callback(*args)
+            except Exception:
+                traceback.print_exc()  # Keep the timer running for every other recognizer
+
+
+timer = None  # The shared Timer, started when the first recognizer is created
+timer_lock = threading.Lock()
+
+
+def shared_timer():
+    global timer
+    with timer_lock:
+        if timer is None:
+            timer = Timer()
+    return timer
+
+
+class LongPress:
+    """A button held for at least the long press time"""
+    __slots__ = ("controller", "button")
+
+    def __init__(self, controller, button):
+        self.controller = controller
+        self.button = button  # Button event of the press
+
+
+class DoubleTap:
+    """A button pressed twice within the double tap time"""
+    __slots__ = ("controller", "button")
+
+    def __init__(self, controller, button):
+        self.controller = controller
+        self.button = button  # Button event of the second press
+
+
+class Chord:
+    """Buttons pressed together, reported once they are all released"""
+    __slots__ = ("controller", "buttons")
+
+    def __init__(self, controller, buttons):
+        self.controller = controller
+        self.buttons = buttons  # Button events of the most buttons that were held at once, in press order
+
+
+class Drag:
+    """A finger rolled across neighbouring buttons, each pressed while the one before was still held"""
+    __slots__ = ("controller", "buttons")
+
+    def __init__(self, controller, buttons):
+        self.controller = controller
+        self.buttons = buttons  # Button events of the path from the first button to the last
+
+
+class GestureRecognizer:
+    """Recognizes long presses, double taps, chords and drags across every button of a controller.
+    Held buttons are tracked as bitmasks of note numbers and long presses are timed by one shared timer thread"""
+
+    def __init__(self, controller, long_press=0.5, double_tap=0.3, chord_window=0.08):
+        self.controller = controller
+        self.long_press = long_press  # Seconds a button is held for to be a long press
+        self.double_tap = double_tap  # Most seconds between two presses of a button for a double tap
+        self.chord_window = chord_window  # Most seconds between the first and last press of a chord
+        self.handlers = {LongPress: [], DoubleTap: [], Chord: [], Drag: []}
+        self.lock = threading.Lock()
+        self.held = 0  # Bitmask of the buttons held, bit n is set while the button on note n is held
+        self.widest = 0  # Bitmask with the most buttons held at once since every button was last released
+        self.tapped_at = [None] * 128  # time.monotonic() of the press of every note that could start a double tap
+        self.pressed_at = [0.0] * 128  # time.monotonic() of the latest press of every note
+        self.presses = [0] * 128  # Number of presses of every note, so a timer can tell its press has ended
+        self.order = []  # Notes pressed since every button was last released, in order
+        self.first_press = self.last_press = 0  # time.monotonic() of the first and latest press in order
+        self.dragging = True  # Every press since every button was released neighbours the one before, still held
+        self.timer = shared_timer()
+        self.note_handlers = {}  # Note number to the handler registered with the controller for it
+        for note, decoded in enumerate(controller.NoteTable):
+            if decoded is not None:
+                self.note_handlers[note] = controller.add_handler(functools.partial(self.on_button, note), notes=[note])
+
+    def close(self):
+        """Stops recognizing gestures"""
+        for handler in self.note_handlers.values():
+            self.controller.remove_handler(handler)
+        self.note_handlers = {}
+
+    def on_long_press(self, func):
+        self.handlers[LongPress].append(func)
+        return func
+
+    def on_double_tap(self, func):
+        self.handlers[DoubleTap].append(func)
+        return func
+
+    def on_chord(self, func):
+        self.handlers[Chord].append(func)
+        return func
+
+    def on_drag(self, func):
+        self.handlers[Drag].append(func)
+        return func
+
+    def emit(self, gesture):
+        for func in self.handlers[type(gesture)]:
+            self.controller.call_handler(func, gesture)
+
+    def button(self, note):
+        """Returns a pressed button event for a note"""
+        event_class, args = self.controller.NoteTable[note]
+        return event_class(self.controller, *args, True)
+
+    def neighbours(self, a, b):
+        """Returns whether two buttons are next to each other, the same kind of button one step apart"""
+        a_class, a_args = self.controller.NoteTable[a]
+        b_class, b_args = self.controller.NoteTable[b]
+        return a_class is b_class and a != b and all(abs(i - j) <= 1 for i, j in zip(a_args, b_args))
+
+    def on_button(self, note, event):
+        now = time.monotonic()
+        bit = 1 << note
+        gestures = []
+        with self.lock:
+            if event.state:
+                if self.held & bit:
+                    return  # Repeated press without a release
+                previous = self.tapped_at[note]
+                self.tapped_at[note] = now
+                self.pressed_at[note] = now
+                self.presses[note] += 1
+                if self.order:
+                    last = self.order[-1]
+                    self.dragging = self.dragging and bool(self.held >> last & 1) and self.neighbours(last, note)
+                else:
+                    self.first_press = now
+                self.last_press = now
+                self.order.append(note)
+                self.held |= bit
+                if bin(self.held).count("1") > bin(self.widest).count("1"):
+                    self.widest = self.held
+                if previous is not None and now - previous <= self.double_tap:
+                    self.tapped_at[note] = None  # A third press starts a new double tap
+                    gestures.append(DoubleTap(self.controller, event))
+                self.timer.schedule(self.long_press, self.on_timer, note, self.presses[note], event)
+            else:
+                if not self.held & bit:
+                    return
+                self.held &= ~bit
+                if not self.held:
+                    gestures.extend(self.end_session())
+        for gesture in gestures:
+            self.emit(gesture)
+
+    def end_session(self):
+        """Reports the chord or drag made since every button was last released"""
+        order, widest, dragging = self.order, self.widest, self.dragging
+        self.order, self.widest, self.dragging = [], 0, True
+        if len(order) < 2:
+            return []
+        if dragging and self.last_press - self.first_press > self.chord_window:
+            return [Drag(self.controller, [self.button(note) for note in order])]
+        notes = [note for note in dict.fromkeys(order) if widest >> note & 1]
+        if len(notes) >= 2:
+            times = [self.pressed_at[note] for note in notes]
+            if max(times) - min(times) <= self.chord_window:
+                return [Chord(self.controller, [self.button(note) for note in notes])]
+        return []
+
+    def on_timer(self, note, press, event):
+        with self.lock:
+            if not (self.held >> note & 1 and self.presses[note] == press and len(self.order) == 1):
+                return  # Released since, or part of a chord or drag
+        self.emit(LongPress(self.controller, event))
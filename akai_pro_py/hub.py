@@ -0,0 +1,109 @@
+import queue
+import threading
+import traceback
+
+from .scheduler import OutputScheduler
+
+
+class ControllerHub:
+    """Services the input and output of any number of controllers from one thread.
+    Input from every controller is handled in the order it arrived, output is interleaved fairly between them"""
+    Batch = 64  # Input messages handled before output gets a turn
+
+    def __init__(self, controllers=(), rate=None):
+        self.inbox = queue.SimpleQueue()  # (controller, message, time received) in arrival order, None to wake up
+        self.controllers = []
+        self.carry = None  # Inbox item taken when a batch was full, handled first on the next round
+        self.woken = False  # A wake up is already waiting in the inbox
+        self.running = False
+        self.thread = None
+        for controller in controllers:
+            self.add(controller, rate)
+
+    def add(self, controller, rate=None):
+        """Moves a controller's input and output onto the hub, rate limits its output to rate messages per second"""
+        controller.stop_output_scheduler()
+        scheduler = OutputScheduler(controller, rate, thread=False)
+        scheduler.wakeup = self.wake
+        controller.output_scheduler = scheduler
+        controller.input_sink = self.receive
+        self.controllers = self.controllers + [controller]
+        return controller
+
+    def remove(self, controller):
+        """Gives a controller back its own input and output, sending anything still queued"""
+        self.controllers = [existing for existing in self.controllers if existing is not controller]
+        controller.input_sink = None
+        controller.stop_output_scheduler()
+
+    def receive(self, controller, message, received):
+        self.inbox.put((controller, message, received))
+
+    def wake(self):
+        if not self.woken:
+            self.woken = True
+            self.inbox.put(None)
+
+    def handle_input(self, item):
+        """Handles the inbox item given and whatever else is waiting, up to a batch"""
+        for _ in range(ControllerHub.Batch):
+            if item is not None:
+                controller, message, received = item
+                controller.last_received = received
+                try:
+                    controller.handle_midi_in(message)
+                except Exception:
+                    traceback.print_exc()  # Counted in the controller's metrics, every controller keeps running
+            try:
+                item = self.inbox.get_nowait()
+            except queue.Empty:
+                return
+
+        self.carry = item  # Batch is full, keep the item for the next round (after output has had a turn)
+
+    def send_output(self):
+        """Sends one message per controller per round until output is done or input is waiting.
+        Returns the seconds until a rate limit allows more output, 0 if output is left, or None if there is none"""
+        self.woken = False
+        wait = None
+        active = self.controllers
+        while active:
+            still_active = []
+            for controller in active:
+                delay = controller.output_scheduler.send_next()
+                if delay == 0:
+                    still_active.append(controller)
+                elif delay is not None:
+                    wait = delay if wait is None else min(wait, delay)
+            active = still_active
+            if active and (self.carry is not None or not self.inbox.empty()):
+                return 0  # Input goes first, the rest of the output is sent on the next round
+        return wait
+
+    def run(self):
+        """Services every controller on the calling thread until stop() is called"""
+        self.running = True
+        timeout = None
+        while self.running:
+            item, self.carry = self.carry, None
+            if item is None:
+                try:
+                    item = self.inbox.get(timeout=timeout)
+                except queue.Empty:
+                    pass
+            self.handle_input(item)
+            timeout = self.send_output()
+
+    def start(self):
+        """Services every controller from a background thread"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name="Controller hub", daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        self.inbox.put(None)
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+        self.thread = None
@@ -0,0 +1,96 @@
+import collections
+import itertools
+import threading
+import traceback
+
+from . import errors
+
+
+class InputQueue:
+    """Bounded queue between the MIDI input callback and dispatch, handled by one thread.
+    When it is full the policy decides what happens to new messages:
+    "block" makes the MIDI callback wait for space, "drop_oldest" drops the oldest queued message,
+    "drop_newest" drops the new message and "latest" replaces the queued value of a fader or knob with the new one,
+    dropping the new message only when it is not a control change that is already queued"""
+    Policies = ("block", "drop_oldest", "drop_newest", "latest")
+
+    def __init__(self, controller, size=256, policy="block"):
+        if policy not in InputQueue.Policies:
+            raise errors.AkaiProPyError(f"Unknown input queue policy {policy!r}, valid options are "
+                                        f"{', '.join(InputQueue.Policies)}")
+        self.controller = controller
+        self.size = size
+        self.policy = policy
+        self.queue = collections.OrderedDict()  # Key to (message, time received)
+        self.keys = itertools.count()  # Keys for messages that are never replaced, control changes are ("cc", control)
+        self.condition = threading.Condition()
+        self.closed = False
+        self.blocked = 0  # Callbacks waiting for space, the input thread keeps running until they have queued
+        self.dropped = 0  # Messages dropped because the queue was full
+        self.high_water = 0  # Most messages queued at once
+        self.thread = threading.Thread(target=self.run, name=f"{controller.name} input", daemon=True)
+        self.thread.start()
+
+    def put(self, controller, message, received):
+        """Queues a message, used as the controller's input_sink"""
+        if self.policy == "latest" and message.type == "control_change":
+            key = ("cc", message.control)
+        else:
+            key = next(self.keys)
+        with self.condition:
+            queue = self.queue
+            if key in queue:
+                queue[key] = (message, received)  # Keeps the queue position of the older value
+                if len(queue) >= self.size:
+                    self.drop()  # A full queue could not have kept both values
+                return
+            if len(queue) >= self.size:
+                if self.policy == "block":
+                    self.blocked += 1
+                    while len(queue) >= self.size:
+                        self.condition.wait()
+                    self.blocked -= 1
+                elif self.policy == "drop_oldest":
+                    queue.popitem(last=False)
+                    self.drop()
+                else:
+                    self.drop()
+                    return
+            queue[key] = (message, received)
+            if len(queue) > self.high_water:
+                self.high_water = len(queue)
+                if self.controller.metrics is not None:
+                    self.controller.metrics.queue_high_water = self.high_water
+            self.condition.notify_all()
+
+    def drop(self):
+        self.dropped += 1
+        if self.controller.metrics is not None:
+            self.controller.metrics.queue_dropped += 1
+
+    def run(self):
+        controller = self.controller
+        while True:
+            with self.condition:
+                while not self.queue and (not self.closed or self.blocked):
+                    self.condition.wait()
+                if not self.queue:
+                    return  # Closed and everything queued was handled
+                message, received = self.queue.popitem(last=False)[1]
+                self.condition.notify_all()  # Wakes a callback blocked on a full queue
+            controller.last_received = received
+            try:
+                controller.handle_midi_in(message)
+            except Exception:
+                traceback.print_exc()  # Keep handling input, like the MIDI callback thread would
+
+    def __len__(self):
+        return len(self.queue)
+
+    def close(self):
+        """Stops the input thread once everything queued has been handled"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        if self.thread is not threading.current_thread():
+            self.thread.join()
@@ -0,0 +1,218 @@
+import itertools
+import os
+import socket
+import socketserver
+import stat
+import struct
+import threading
+
+from . import errors
+
+# Commands are an opcode followed by fixed size arguments, any number of them can be sent back to back
+SET = 0x01  # note, colour
+SET_MANY = 0x02  # count, then count times note, colour
+FILL = 0x03  # colour, count, then count notes, a count of 0 fills every LED
+CLEAR = 0x04  # Turns off every LED
+PAGE = 0x05  # length, then the page name in UTF-8, shows a page stored with define_page or save_page
+FLUSH = 0x06  # Sends the LEDs drawn so far, the server also flushes after every read from the socket
+SYNC = 0x07  # 4 byte token, answered with ACK and the token once everything before it was sent
+ACK = 0x87
+Token = struct.Struct("<I")
+
+
+class LEDRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        framebuffer = self.server.controller.framebuffer
+        pending = b""  # Start of a command split across reads
+        while True:
+            data = self.request.recv(65536)
+            if not data:
+                return
+            with framebuffer.lock:  # Every command in a read is applied and sent together
+                pending, acks = self.server.apply(pending + data)
+                framebuffer.flush()
+            if acks:
+                self.request.sendall(b"".join(bytes((ACK,)) + token for token in acks))
+
+
+def is_socket(path):
+    try:
+        return stat.S_ISSOCK(os.lstat(path).st_mode)
+    except FileNotFoundError:
+        return False
+
+
+class LEDServer:
+    """Lets other processes set a controller's LEDs over a Unix socket (a path) or TCP (a (host, port) tuple).
+    Commands are drawn into the controller's framebuffer and every LED that changed is sent once per read.
+    LEDs set to a colour they do not accept are skipped, like notes without an LED, and counted in skipped"""
+
+    def __init__(self, controller, address):
+        self.controller = controller
+        self.address = address
+        self.colours = controller.LEDColours  # Note to the velocities its LED accepts, None if it has no LED
+        self.skipped = 0
+        if isinstance(address, str):
+            if is_socket(address):
+                os.unlink(address)  # Left over from a server that did not stop cleanly
+            elif os.path.lexists(address):
+                raise errors.AkaiProPyError(f"Cannot serve LEDs on {address}, it exists and is not a socket")
+            self.server = socketserver.ThreadingUnixStreamServer(address, LEDRequestHandler)
+        else:
+            self.server = socketserver.ThreadingTCPServer(address, LEDRequestHandler)
+            self.address = self.server.server_address  # Includes the port picked when it was 0
+        self.server.daemon_threads = True
+        self.server.controller = controller
+        self.server.apply = self.apply
+        self.thread = None
+
+    def apply(self, data):
+        """Draws every complete command in data, returns the incomplete end of data and the SYNC tokens seen"""
+        framebuffer = self.controller.framebuffer
+        colours = self.colours
+        acks = []
+        i = 0
+        length = len(data)
+        while i < length:
+            opcode = data[i]
+            if opcode == SET:
+                if i + 3 > length:
+                    break
+                note, colour = data[i + 1], data[i + 2]
+                if note < 128 and colours[note] is not None and colour in colours[note]:
+                    framebuffer.draw(note, colour)
+                else:
+                    self.skipped += 1
+                i += 3
+            elif opcode == SET_MANY:
+                if i + 2 > length or i + 2 + data[i + 1] * 2 > length:
+                    break
+                end = i + 2 + data[i + 1] * 2
+                for j in range(i + 2, end, 2):
+                    note, colour = data[j], data[j + 1]
+                    if note < 128 and colours[note] is not None and colour in colours[note]:
+                        framebuffer.draw(note, colour)
+                    else:
+                        self.skipped += 1
+                i = end
+            elif opcode == FILL:
+                if i + 3 > length or i + 3 + data[i + 2] > length:
+                    break
+                end = i + 3 + data[i + 2]
+                colour = data[i + 1]
+                notes = data[i + 3:end] or framebuffer.notes
+                valid = [note for note in notes if note < 128 and colours[note] is not None and colour in colours[note]]
+                framebuffer.fill(colour, valid)
+                self.skipped += len(notes) - len(valid)
+                i = end
+            elif opcode == CLEAR:
+                framebuffer.fill(0)
+                i += 1
+            elif opcode == PAGE:
+                if i + 2 > length or i + 2 + data[i + 1] > length:
+                    break
+                end = i + 2 + data[i + 1]
+                name = data[i + 2:end].decode("utf-8", "replace")
+                if name in framebuffer.pages:
+                    framebuffer.show_page(name)
+                i = end
+            elif opcode == FLUSH:
+                framebuffer.flush()
+                i += 1
+            elif opcode == SYNC:
+                if i + 5 > length:
+                    break
+                framebuffer.flush()
+                acks.append(data[i + 1:i + 5])
+                i += 5
+            else:
+                raise errors.AkaiProPyError(f"Unknown LED command {opcode:#x}")  # Ends the connection
+        return data[i:], acks
+
+    def start(self):
+        """Serves from a background thread"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.server.serve_forever, name=f"{self.controller.name} LED server",
+                                           daemon=True)
+            self.thread.start()
+            self.controller.led_servers.append(self)
+        return self
+
+    def stop(self):
+        if self.thread is not None:
+            self.server.shutdown()
+            self.thread.join()
+            self.thread = None
+            self.controller.led_servers.remove(self)
+        self.server.server_close()
+        if isinstance(self.address, str) and is_socket(self.address):
+            os.unlink(self.address)
+
+
+class LEDClient:
+    """Sends LED commands to an LEDServer. Commands are buffered and sent together by send() or sync()"""
+
+    def __init__(self, address):
+        family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+        self.socket = socket.socket(family, socket.SOCK_STREAM)
+        self.socket.connect(address)
+        if family == socket.AF_INET:
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.buffer = bytearray()
+        self.tokens = itertools.count(1)
+
+    def set(self, note, colour):
+        self.buffer += bytes((SET, note, colour))
+
+    def set_many(self, leds):
+        """Sets LEDs from an iterable of (note, colour)"""
+        leds = list(leds)
+        for start in range(0, len(leds), 255):
+            chunk = leds[start:start + 255]
+            self.buffer += bytes((SET_MANY, len(chunk)))
+            self.buffer += bytes(value for led in chunk for value in led)
+
+    def fill(self, colour, notes=None):
+        """Sets every LED, or only the notes given, to a colour. An empty list of notes sets nothing"""
+        if notes is None:
+            self.buffer += bytes((FILL, colour, 0))  # A count of 0 fills every LED
+            return
+        notes = bytes(notes)
+        for start in range(0, len(notes), 255):
+            chunk = notes[start:start + 255]
+            self.buffer += bytes((FILL, colour, len(chunk))) + chunk
+
+    def clear(self):
+        self.buffer.append(CLEAR)
+
+    def show_page(self, name):
+        name = name.encode("utf-8")
+        self.buffer += bytes((PAGE, len(name))) + name
+
+    def send(self):
+        """Sends every buffered command as one write"""
+        if self.buffer:
+            self.socket.sendall(self.buffer)
+            self.buffer = bytearray()
+
+    def sync(self):
+        """Sends every buffered command and waits until the server has sent them to the controller"""
+        token = Token.pack(next(self.tokens) & 0xFFFFFFFF)
+        self.buffer += bytes((SYNC,)) + token
+        self.send()
+        reply = b""
+        while not reply.endswith(bytes((ACK,)) + token):
+            data = self.socket.recv(4096)
+            if not data:
+                raise errors.AkaiProPyError("LED server closed the connection")
+            reply += data
+
+    def close(self):
+        self.send()
+        self.socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
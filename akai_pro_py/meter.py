@@ -0,0 +1,37 @@
+numpy = None  # Imported when the first meter is rendered so importing the library stays quick, False if missing
+
+
+def use_numpy():
+    """Returns numpy if it is installed, meters are rendered in pure Python without it"""
+    global numpy
+    if numpy is None:
+        try:
+            import numpy as module
+        except ImportError:
+            module = False
+        numpy = module
+    return numpy
+
+
+def meter_thresholds(maximum, rows=8):
+    """Returns evenly spaced row thresholds for levels from 0 to maximum, a row lights up above its threshold"""
+    return tuple(maximum * row / rows for row in range(rows))
+
+
+def render_meter(levels, thresholds, colours):
+    """Returns the colour of every cell of a bar graph as bytes, column by column from the bottom row up.
+    A cell is lit with its row's colour when its column's level is above its row's threshold"""
+    if use_numpy():
+        lit = numpy.asarray(levels, dtype=float)[:, None] > numpy.asarray(thresholds, dtype=float)[None, :]
+        return numpy.where(lit, numpy.asarray(colours, dtype=numpy.uint8)[None, :], 0).astype(numpy.uint8).tobytes()
+    rows = tuple(zip(thresholds, colours))
+    return bytes(colour if level > threshold else 0 for level in levels for threshold, colour in rows)
+
+
+def draw_cells(drawn, notes, cells):
+    """Draws the colours in cells into a framebuffer's drawn colours at the notes given, in order"""
+    if use_numpy():
+        numpy.frombuffer(drawn, dtype=numpy.uint8)[list(notes[:len(cells)])] = numpy.frombuffer(cells, numpy.uint8)
+    else:
+        for note, colour in zip(notes, cells):
+            drawn[note] = colour
@@ -0,0 +1,87 @@
+import threading
+
+SubBuckets = 4  # Buckets per power of two, latencies are kept to within about 20%
+
+
+def bucket_of(ns):
+    """Returns the histogram bucket a duration in nanoseconds falls into"""
+    bits = ns.bit_length()
+    if bits <= 2:
+        return ns
+    return (bits - 2) * SubBuckets + ((ns >> (bits - 3)) & (SubBuckets - 1))
+
+
+def bucket_limit(bucket):
+    """Returns the largest duration in nanoseconds that falls into a bucket"""
+    if bucket < SubBuckets:
+        return bucket
+    bits = bucket // SubBuckets + 2
+    return ((SubBuckets + bucket % SubBuckets + 1) << (bits - 3)) - 1
+
+
+class Histogram:
+    """Log-bucketed histogram of durations in nanoseconds, recording is one bucket increment"""
+
+    def __init__(self):
+        self.counts = [0] * (64 * SubBuckets)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, ns):
+        self.counts[bucket_of(ns)] += 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def percentile(self, fraction):
+        """Returns the duration in nanoseconds that fraction of recordings are at or below"""
+        if not self.count:
+            return 0
+        wanted = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= wanted:
+                return min(bucket_limit(bucket), self.max)
+        return self.max
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "mean_us": self.total / self.count / 1000 if self.count else 0,
+            "p50_us": self.percentile(0.50) / 1000,
+            "p99_us": self.percentile(0.99) / 1000,
+            "max_us": self.max / 1000,
+        }
+
+
+class ControllerMetrics:
+    """Counters and latency histograms for a controller's input and output paths"""
+    Counters = ("messages_in", "messages_out", "dispatched", "dropped", "errors",
+                "queue_dropped", "queue_high_water")
+    Histograms = ("dispatch_latency", "handler_time", "send_time")
+
+    def __init__(self):
+        self.lock = threading.Lock()  # Only taken for snapshots and resets, recording is not locked
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.messages_in = 0  # Messages received from the controller
+            self.messages_out = 0  # Messages written to the controller
+            self.dispatched = 0  # Events handed to handlers
+            self.dropped = 0  # Messages that were not dispatched, nothing was listening or it was not a control
+            self.errors = 0  # Handlers that raised an exception
+            self.queue_dropped = 0  # Messages dropped or replaced because the input queue was full
+            self.queue_high_water = 0  # Most messages waiting in the input queue at once
+            self.dispatch_latency = Histogram()  # Time from the MIDI callback until the handlers are called
+            self.handler_time = Histogram()  # Time spent in handlers for each event
+            self.send_time = Histogram()  # Time spent writing each message to the MIDI port
+
+    def snapshot(self):
+        with self.lock:
+            stats = {name: getattr(self, name) for name in ControllerMetrics.Counters}
+            stats.update({name: getattr(self, name).snapshot() for name in ControllerMetrics.Histograms})
+        return stats
@@ -0,0 +1,59 @@
+class StateMirror:
+    """Current position of every fader and knob and which buttons are held, updated in place as messages arrive.
+    The buffers are never replaced, so views of them (memoryviews, numpy.frombuffer) stay current without copying"""
+
+    def __init__(self, controller):
+        self.controller = controller
+        self.control_slots = [None] * 128  # Control number to its index in controls
+        self.note_slots = [None] * 128  # Note number to its index in buttons
+        numbers = {"control": [], "note": []}
+        for name, kind, mapping, shape in controller.MirrorLayout:
+            slots = self.control_slots if kind == "control" else self.note_slots
+            for number in mapping:
+                if slots[number] is None:
+                    slots[number] = len(numbers[kind])
+                    numbers[kind].append(number)
+        self.controls = bytearray(len(numbers["control"]))  # Latest value of every fader and knob
+        self.buttons = bytearray(len(numbers["note"]))  # 1 for every button that is held, 0 otherwise
+        self.held = 0  # Bitmask of held buttons, bit n is set while the button on note n is held
+
+        self.views = {}  # Name to a memoryview of its part of controls or buttons, laid out like the mapping
+        for name, kind, mapping, shape in controller.MirrorLayout:
+            slots = self.control_slots if kind == "control" else self.note_slots
+            buffer = memoryview(self.controls if kind == "control" else self.buttons)
+            start = slots[mapping[0]]
+            view = buffer[start:start + len(mapping)]
+            self.views[name] = view.cast("B", shape) if shape is not None else view
+
+    def __getitem__(self, name):
+        """Returns the zero-copy view of a group of controls, e.g. mirror["faders"][3] or mirror["knobs"][1, 2]"""
+        return self.views[name]
+
+    def control(self, control, value):
+        slot = self.control_slots[control]
+        if slot is not None:
+            self.controls[slot] = value
+
+    def note(self, note, state):
+        slot = self.note_slots[note]
+        if slot is not None:
+            self.buttons[slot] = state
+            if state:
+                self.held |= 1 << note
+            else:
+                self.held &= ~(1 << note)
+
+    def value(self, control):
+        """Returns the latest value of a control number, None if it is not a fader or knob"""
+        slot = self.control_slots[control]
+        return None if slot is None else self.controls[slot]
+
+    def is_held(self, note):
+        """Returns whether the button on a note number is held"""
+        return bool(self.held >> note & 1)
+
+    @property
+    def leds(self):
+        """Zero-copy view of the colour each LED note is showing, indexed by note, 0xFF where it is not known"""
+        framebuffer = self.controller.framebuffer
+        return None if framebuffer is None else memoryview(framebuffer.shown)
@@ -0,0 +1,52 @@
+class PooledEvent:
+    """Mixin for pooled events, they are shared between every dispatch of the same control and state so are read-only"""
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Pooled {type(self).__name__} events are read-only")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Pooled {type(self).__name__} events are read-only")
+
+
+pooled_classes = {}  # Event class to its read-only pooled subclass
+
+
+def freeze(event):
+    """Turns an event into a read-only pooled event, still an instance of the same event class"""
+    event_class = type(event)
+    if event_class not in pooled_classes:
+        pooled_classes[event_class] = type(event_class.__name__, (PooledEvent, event_class),
+                                           {"__slots__": (), "__qualname__": event_class.__qualname__,
+                                            "__module__": event_class.__module__})
+    event.__class__ = pooled_classes[event_class]
+    return event
+
+
+class EventPool:
+    """Preallocated events for every (control, state) pair of a controller, so dispatching allocates nothing"""
+
+    def __init__(self, controller):
+        self.notes = [None] * 128  # Note number to (released event, pressed event)
+        self.controls = [None] * 128  # Control number to a tuple of events indexed by value
+        for note, decoded in enumerate(controller.NoteTable):
+            if decoded is not None:
+                self.notes[note] = tuple(freeze(decoded[0](controller, *decoded[1], state)) for state in (False, True))
+        for control, decoded in enumerate(controller.ControlTable):
+            if decoded is not None:
+                self.controls[control] = tuple(freeze(decoded[0](controller, *decoded[1], value))
+                                               for value in range(128))
+
+    def note(self, note, state):
+        """Returns the pooled event for a button changing to the state given, or None if there is no such button"""
+        events = self.notes[note]
+        if events is not None:
+            return events[state]
+        return None
+
+    def control(self, control, value):
+        """Returns the pooled event for a fader or knob moving to the value given, or None if there is no such control"""
+        events = self.controls[control]
+        if events is not None:
+            return events[value]
+        return None
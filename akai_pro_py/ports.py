@@ -0,0 +1,31 @@
+import mido
+import mido.ports
+
+
+class MemoryOutput(mido.ports.BaseOutput):
+    """Output port that hands sent messages to a function, or keeps them in memory, instead of a MIDI device"""
+
+    def _open(self, sink=None, **kwargs):
+        self.sink = sink  # Called with every sent message, messages are kept in self.messages if None
+        self.messages = []
+
+    def _send(self, msg):
+        if self.sink is not None:
+            self.sink(msg)
+        else:
+            self.messages.append(msg)
+
+
+class MemoryInput(mido.ports.BaseInput):
+    """Input port that receives messages passed to feed() instead of messages from a MIDI device"""
+
+    def _open(self, **kwargs):
+        self.callback = None  # Called with every fed message, like the callback of a real input port
+
+    def feed(self, msg):
+        """Receives a message as if it came from a MIDI device"""
+        if self.callback is not None:
+            self.callback(msg)
+        else:
+            with self._lock:
+                self._messages.append(msg)
@@ -0,0 +1,92 @@
+import queue
+import struct
+import threading
+import time
+
+import mido
+
+from . import errors
+
+Magic = b"AKPR\x01"  # File header, the format version is the last byte
+Record = struct.Struct("<QH")  # time.monotonic_ns() received and message length, followed by the message bytes
+
+
+class Recorder:
+    """Writes every MIDI message a controller receives to a file from a background thread"""
+
+    def __init__(self, controller, path):
+        self.controller = controller
+        self.path = path
+        self.file = open(path, "wb")
+        self.file.write(Magic)
+        self.queue = queue.SimpleQueue()  # (time received, message) waiting to be written, None to stop
+        self.recorded = 0  # Messages written
+        self.thread = threading.Thread(target=self.run, name=f"{controller.name} recorder", daemon=True)
+        self.thread.start()
+
+    def record(self, received, message):
+        """Queues a message for writing, called from the MIDI callback so it never waits on the file"""
+        self.queue.put((received, message))
+
+    def run(self):
+        pack = Record.pack
+        while True:
+            item = self.queue.get()
+            chunks = []
+            while item is not None:  # Write everything that is waiting at once
+                received, message = item
+                data = bytes(message.bytes())
+                chunks.append(pack(received, len(data)))
+                chunks.append(data)
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            self.file.write(b"".join(chunks))
+            self.recorded += len(chunks) // 2
+            if item is None:
+                self.file.close()
+                return
+
+    def close(self):
+        """Writes anything still queued and closes the file"""
+        self.queue.put(None)
+        self.thread.join()
+
+
+def read_recording(path):
+    """Yields (time received in nanoseconds, message) for every message in a recording"""
+    parsed = {}  # Encoded message to its mido message, recordings repeat the same few messages a lot
+    with open(path, "rb") as file:
+        if file.read(len(Magic)) != Magic:
+            raise errors.AkaiProPyError(f"{path} is not a controller recording!")
+        while True:
+            header = file.read(Record.size)
+            if len(header) < Record.size:
+                return  # End of the recording, or a record cut off when recording stopped
+            received, length = Record.unpack(header)
+            data = file.read(length)
+            if len(data) < length:
+                return
+            message = parsed.get(data)
+            if message is None:
+                message = parsed[data] = mido.Message.from_bytes(data)
+            yield received, message
+
+
+def replay(controller, path, speed=1.0):
+    """Feeds a recording through a controller's pre_event_dispatch, returns how many messages were replayed.
+    speed scales the recorded timing, 2 replays twice as fast, None or 0 replays as fast as possible"""
+    replayed = 0
+    first = None
+    for received, message in read_recording(path):
+        if speed:
+            if first is None:
+                first, started = received, time.monotonic_ns()
+            delay = (started + (received - first) / speed - time.monotonic_ns()) / 1e9
+            if delay > 0:
+                time.sleep(delay)
+        controller.last_received = time.monotonic_ns()
+        controller.pre_event_dispatch(message)
+        replayed += 1
+    return replayed
@@ -0,0 +1,123 @@
+import struct
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+from . import errors
+
+Magic = b"AKEV"
+Version = 1
+Header = struct.Struct("<4sBB2xI")  # Magic, version, product ID of the controller, capacity in records
+Position = struct.Struct("<Q")  # Records written so far, stored after the header
+PositionOffset = 16
+RecordsOffset = 24
+Record = struct.Struct("<QQBBB5x")  # Position + 1 (0 while being written), time.monotonic_ns() received, MIDI bytes
+Sequence = struct.Struct("<Q")  # The first field of a record on its own
+NOTE_ON = 0x90
+NOTE_OFF = 0x80
+CONTROL_CHANGE = 0xB0
+
+
+class EventRing:
+    """Publishes a controller's button and control messages into a shared memory ring of fixed size records.
+    Any number of EventRingReaders in other processes can follow it, the writer never waits for them"""
+
+    def __init__(self, controller, name=None, capacity=4096):
+        self.controller = controller
+        self.capacity = capacity
+        self.memory = shared_memory.SharedMemory(name, create=True, size=RecordsOffset + capacity * Record.size)
+        self.name = self.memory.name  # Name readers attach with
+        self.buffer = self.memory.buf
+        Header.pack_into(self.buffer, 0, Magic, Version, controller.ProductID or 0, capacity)
+        self.position = 0
+        Position.pack_into(self.buffer, PositionOffset, 0)
+
+    def publish(self, status, data1, data2):
+        """Writes one message into the next record, overwriting the oldest once the ring is full"""
+        position = self.position
+        offset = RecordsOffset + position % self.capacity * Record.size
+        buffer = self.buffer
+        Sequence.pack_into(buffer, offset, 0)  # Readers of the old record can tell it is being overwritten
+        Record.pack_into(buffer, offset, 0, self.controller.last_received, status, data1, data2)
+        # The position goes in last, so a reader that sees it unchanged after reading the record read it whole
+        Sequence.pack_into(buffer, offset, position + 1)
+        self.position = position + 1
+        Position.pack_into(buffer, PositionOffset, self.position)
+
+    def close(self):
+        """Removes the ring, readers that are attached keep their mapping until they close"""
+        self.buffer = None
+        self.memory.close()
+        if sys.version_info < (3, 13):  # A reader forked from this process may have unregistered it, see attach()
+            resource_tracker.register(self.memory._name, "shared_memory")
+        self.memory.unlink()
+
+
+def attach(name):
+    """Attaches to existing shared memory without the resource tracker removing it when this process exits"""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, track=False)
+    memory = shared_memory.SharedMemory(name)
+    resource_tracker.unregister(memory._name, "shared_memory")
+    return memory
+
+
+class EventRingReader:
+    """Follows an EventRing from another process, yielding the same events on_event receives.
+    A reader that falls more than the ring's capacity behind skips to the oldest record still there"""
+
+    def __init__(self, name, controller_classes=None):
+        from .discovery import ControllerClasses
+        self.memory = attach(name)
+        self.buffer = self.memory.buf
+        magic, version, product_id, self.capacity = Header.unpack_from(self.buffer, 0)
+        if magic != Magic or version != Version:
+            raise errors.AkaiProPyError(f"Shared memory {name} is not a controller event ring!")
+        controller_class = next((controller_class for controller_class in controller_classes or ControllerClasses
+                                 if controller_class.ProductID == product_id), None)
+        if controller_class is None:
+            raise errors.AkaiProPyError(f"Unknown controller product ID {product_id} in event ring {name}")
+        self.controller = controller_class(lazy=True)  # Never opened, it only gives events their tables and type
+        self.position = Position.unpack_from(self.buffer, PositionOffset)[0]  # Starts with the next event published
+        self.lost = 0  # Records overwritten before this reader got to them
+
+    def read(self):
+        """Returns a list of (time received, event) for every record published since the last read"""
+        buffer = self.buffer
+        written = Position.unpack_from(buffer, PositionOffset)[0]
+        if written - self.position > self.capacity:
+            self.lost += written - self.capacity - self.position
+            self.position = written - self.capacity
+        events = []
+        while self.position < written:
+            offset = RecordsOffset + self.position % self.capacity * Record.size
+            sequence, received, status, data1, data2 = Record.unpack_from(buffer, offset)
+            self.position += 1
+            if sequence != self.position or Sequence.unpack_from(buffer, offset)[0] != self.position:
+                self.lost += 1  # Overwritten while it was being read
+                continue
+            event = self.decode(status, data1, data2)
+            if event is not None:
+                events.append((received, event))
+        return events
+
+    def decode(self, status, data1, data2):
+        kind = status & 0xF0
+        if kind == CONTROL_CHANGE:
+            return self.controller.decode_control(data1, data2)
+        if kind == NOTE_ON or kind == NOTE_OFF:
+            return self.controller.decode_note(data1, kind == NOTE_ON)
+        return None
+
+    def events(self, poll=0.001):
+        """Yields every event as it is published, checking for new records every poll seconds when idle"""
+        while True:
+            events = self.read()
+            for received, event in events:
+                yield event
+            if not events:
+                time.sleep(poll)
+
+    def close(self):
+        self.buffer = None
+        self.memory.close()
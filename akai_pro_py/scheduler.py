@@ -0,0 +1,80 @@
+import collections
+import threading
+import time
+
+
+class OutputScheduler:
+    """Sends a controller's outgoing messages from one writer thread, queued writes to a note are replaced by newer ones"""
+
+    def __init__(self, controller, rate=None, thread=True):
+        self.controller = controller
+        self.rate = rate  # Maximum messages per second sent to the device, None for no limit
+        self.interval = 1 / rate if rate else 0
+        self.next_send = time.monotonic()  # Earliest time the rate limit allows the next message
+        self.pending = collections.OrderedDict()  # (status, note) to the newest 3 byte message for it, oldest first
+        self.condition = threading.Condition()
+        self.closed = False
+        self.wakeup = None  # Called when messages are queued, for schedulers driven by send_next() instead of a thread
+        self.thread = None
+        if thread:
+            self.thread = threading.Thread(target=self.run, name=f"{controller.name} output", daemon=True)
+            self.thread.start()
+
+    def put(self, data):
+        """Queues a stream of 3 byte MIDI messages without waiting for them to be sent"""
+        with self.condition:
+            for i in range(0, len(data), 3):
+                message = bytes(data[i:i + 3])
+                self.pending[message[:2]] = message  # Keeps the queue position of an older write to the same note
+            self.condition.notify()
+        if self.wakeup is not None:
+            self.wakeup()
+
+    def take(self):
+        """Waits for queued messages and takes as many as the rate limit allows to be sent at once"""
+        with self.condition:
+            while not self.pending and not self.closed:
+                self.condition.wait()
+            count = len(self.pending) if self.rate is None else min(len(self.pending), 1)
+            return b"".join(self.pending.popitem(last=False)[1] for _ in range(count))
+
+    def run(self):
+        while True:
+            data = self.take()
+            if not data:
+                return  # Closed and nothing left to send
+            if self.interval:
+                delay = self.next_send - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                self.next_send = max(self.next_send, time.monotonic() - self.interval) + self.interval
+            self.controller.write_bytes(data)
+
+    def send_next(self):
+        """Writes the next queued message if the rate limit allows, without waiting.
+        Returns 0 if more can be sent now, the seconds until the rate limit allows more, or None if nothing is queued"""
+        if self.interval:
+            delay = self.next_send - time.monotonic()
+            if delay > 0:
+                return delay if self.pending else None
+        with self.condition:
+            if not self.pending:
+                return None
+            message = self.pending.popitem(last=False)[1]
+            more = bool(self.pending)
+        self.controller.write_bytes(message)
+        if self.interval:
+            self.next_send = max(self.next_send, time.monotonic() - self.interval) + self.interval
+            return self.interval if more else None
+        return 0 if more else None
+
+    def close(self, wait=True):
+        """Stops the writer thread once everything queued has been sent"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        if self.thread is None:
+            while self.pending:
+                self.controller.write_bytes(self.take())
+        elif wait:
+            self.thread.join()
@@ -0,0 +1,163 @@
+import queue
+import random
+import threading
+import time
+
+import mido
+
+from .APCmini import APCMini
+from .MIDIMix import MIDIMix
+from .base_controller import Controller
+from .ports import MemoryInput, MemoryOutput
+
+
+class VirtualController:
+    """A simulated controller for testing without hardware.
+    It answers the Device Enquiry, tracks its LEDs from incoming notes and can send scripted or random traffic"""
+    ControllerClass = Controller  # Controller class that drives this device
+    ManufacturerID = Controller.ManufacturerID
+    ProductID = 0
+
+    def __init__(self, name=None, virtual=False):
+        self.name = name or f"Virtual {self.ControllerClass.__name__}"
+        self.leds = bytearray(128)  # LED colour of every note, as last set by the host
+        self.received = 0  # Messages received from the host
+        self.outbox = queue.SimpleQueue()  # Messages waiting to be sent to the host, in order
+        self.virtual = virtual
+        if virtual:  # rtmidi virtual ports that other programs can open by name
+            self.device_out = mido.open_output(self.name, virtual=True)
+            self.device_in = mido.open_input(self.name, virtual=True, callback=self.receive)
+            self.midi_in, self.midi_out = self.name, self.name
+        else:  # In-memory ports for a controller in the same process
+            self.midi_in = MemoryInput(f"{self.name} in")
+            self.midi_out = MemoryOutput(f"{self.name} out", sink=self.receive)
+        self.thread = threading.Thread(target=self.run, name=f"{self.name} wire", daemon=True)
+        self.thread.start()
+
+    @classmethod
+    def identity_reply(cls):
+        """Returns the Device Enquiry reply of this device, as checked by the controller's product_detect"""
+        return mido.Message("sysex", data=[0x7E, 0x00, 0x06, 0x02, cls.ManufacturerID, cls.ProductID,
+                                           0x00, 0x19, 0x00, 0x01, 0x00, 0x00, 0x00])
+
+    def connect(self):
+        """Creates the controller that drives this device"""
+        return self.ControllerClass(self.midi_in, self.midi_out)
+
+    def receive(self, msg):
+        """Handles a message sent by the host to the device"""
+        self.received += 1
+        if msg.type == "sysex" and list(msg.bytes()) == Controller.DeviceEnquiry:
+            self.send(self.identity_reply())
+        elif msg.type == "note_on":
+            self.leds[msg.note] = msg.velocity
+        elif msg.type == "note_off":
+            self.leds[msg.note] = 0
+
+    def send(self, msg):
+        """Sends a message from the device to the host, delivered in order by the wire thread"""
+        self.outbox.put(msg)
+
+    def run(self):
+        while True:
+            msg = self.outbox.get()
+            if msg is None:
+                return
+            if self.virtual:
+                self.device_out.send(msg)
+            else:
+                self.midi_in.feed(msg)
+
+    def close(self):
+        """Stops delivering messages to the host and closes any virtual ports"""
+        self.outbox.put(None)
+        self.thread.join()
+        if self.virtual:
+            self.device_out.close()
+            self.device_in.close()
+
+    def press(self, note):
+        self.send(mido.Message("note_on", note=note, velocity=127))
+
+    def release(self, note):
+        self.send(mido.Message("note_off", note=note, velocity=0))
+
+    def move(self, control, value):
+        self.send(mido.Message("control_change", control=control, value=value))
+
+    def play(self, script, speed=1.0):
+        """Sends (delay in seconds, message) pairs from a script, waiting each delay divided by speed"""
+        for delay, msg in script:
+            if delay and speed:
+                time.sleep(delay / speed)
+            self.send(msg)
+
+    def generate(self, rate=100, count=None, duration=None, seed=None, controls=True, buttons=True):
+        """Sends random fader/knob moves and button presses at rate messages per second from a background thread.
+        Runs until count messages or duration seconds are reached, or the returned event is set"""
+        stop = threading.Event()
+        numbers = ([("control", number) for number, decoded in enumerate(self.ControllerClass.ControlTable)
+                    if decoded is not None] if controls else []) + \
+                  ([("note", number) for number, decoded in enumerate(self.ControllerClass.NoteTable)
+                    if decoded is not None] if buttons else [])
+
+        def run():
+            generator = random.Random(seed)
+            values = {}  # Current position of every control, moved in small steps like a hand would
+            held = set()
+            interval = 1 / rate
+            next_send = time.monotonic()
+            end = None if duration is None else next_send + duration
+            sent = 0
+            while not stop.is_set() and (count is None or sent < count) and (end is None or next_send < end):
+                kind, number = generator.choice(numbers)
+                if kind == "control":
+                    values[number] = min(127, max(0, values.get(number, 64) + generator.randint(-8, 8)))
+                    self.move(number, values[number])
+                elif number in held:
+                    held.discard(number)
+                    self.release(number)
+                else:
+                    held.add(number)
+                    self.press(number)
+                sent += 1
+                next_send += interval
+                delay = next_send - time.monotonic()
+                if delay > 0:
+                    stop.wait(delay)
+            for number in held:
+                self.release(number)
+
+        threading.Thread(target=run, name=f"{self.name} traffic", daemon=True).start()
+        return stop
+
+
+class VirtualAPCMini(VirtualController):
+    """A simulated Akai APC Mini"""
+    ControllerClass = APCMini
+    ProductID = APCMini.ProductID
+
+    def grid_led(self, x, y):
+        """Returns the colour of a grid LED as last set by the host"""
+        return self.leds[APCMini.GridMapping[x][y]]
+
+    def press_grid(self, x, y):
+        self.press(APCMini.GridMapping[x][y])
+
+    def release_grid(self, x, y):
+        self.release(APCMini.GridMapping[x][y])
+
+    def move_fader(self, fader_id, value):
+        self.move(APCMini.FaderMapping[fader_id], value)
+
+
+class VirtualMIDIMix(VirtualController):
+    """A simulated Akai MIDI Mix"""
+    ControllerClass = MIDIMix
+    ProductID = MIDIMix.ProductID
+
+    def move_fader(self, fader_id, value):
+        self.move(MIDIMix.FaderMapping[fader_id], value)
+
+    def move_knob(self, x, y, value):
+        self.move(MIDIMix.KnobGridMapping[x][y], value)
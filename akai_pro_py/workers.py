@@ -0,0 +1,52 @@
+import collections
+import concurrent.futures
+import threading
+import traceback
+
+
+class HandlerPool:
+    """Runs a controller's handlers on worker threads so slow handlers do not hold up input.
+    Events with the same key (the same button or control) are handled one at a time in the order they arrived,
+    events with different keys are handled in parallel on up to workers threads"""
+    Batch = 16  # Events handled for one key before the worker goes back to the end of the queue
+
+    def __init__(self, controller, workers=4):
+        self.controller = controller
+        self.executor = concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix=f"{controller.name} handler")
+        self.waiting = {}  # Key to a deque of (event, handlers, time received), present while the key is being handled
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def submit(self, key, event, handlers, received):
+        """Queues an event to be handled after the events already queued with the same key, never waits"""
+        with self.lock:
+            waiting = self.waiting.get(key)
+            if waiting is not None:
+                waiting.append((event, handlers, received))
+                return
+            self.waiting[key] = collections.deque(((event, handlers, received),))
+        self.executor.submit(self.run, key)
+
+    def run(self, key):
+        waiting = self.waiting[key]
+        handled = 0
+        while True:
+            with self.lock:
+                if not waiting:
+                    del self.waiting[key]
+                    return
+                if handled == HandlerPool.Batch and not self.closed:
+                    self.executor.submit(self.run, key)  # Let other keys have a turn before handling more of this one
+                    return
+                event, handlers, received = waiting.popleft()
+            try:
+                self.controller.run_handlers(event, handlers, received)
+            except Exception:
+                traceback.print_exc()  # Counted in the controller's metrics, the next event still runs
+            handled += 1
+
+    def close(self, wait=True):
+        """Stops the workers once every queued event has been handled"""
+        with self.lock:
+            self.closed = True  # Workers finish their keys instead of going back to the end of the queue
+        self.executor.shutdown(wait)
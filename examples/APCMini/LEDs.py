@@ -11,3 +11,7 @@ for x in range(0, 8):
         apc.gridbuttons.set_led(x, y, "red")
         time.sleep(0.005)
 
+apc.gridbuttons.fill("green")  # Bulk operations send all the LEDs in one batch
+apc.gridbuttons.fill_row(0, "yellow")
+apc.gridbuttons.fill_column(0, "red")
+apc.sidebuttons.fill("green")
@@ -0,0 +1,21 @@
+from akai_pro_py import controllers
+from akai_pro_py.animation import Animator, ScrollingText, Sprite, Overlay
+
+# apc = ApcMini(midi_in=None, midi_out=None)
+apc = controllers.APCMini('APC MINI MIDI 1', 'APC MINI MIDI 1')
+
+apc.reset()  # turn off all leds
+
+animator = Animator(apc, fps=30)  # Renders layers onto the grid 30 times a second, only sending what changed
+animator.add(ScrollingText("HELLO APC", speed=10))
+animator.add(Sprite(["5.5", ".5."], dx=2))  # A small sprite moving right 2 cells a second
+presses = animator.add(Overlay())  # Button presses drawn over the animation
+
+
+@apc.on_grid_button()
+def on_grid_button(event):
+    presses.set(event.x, event.y, 3 if event.state else 0)
+
+
+animator.start()
+apc.start()  # Starts the event loop
@@ -0,0 +1,19 @@
+from akai_pro_py import controllers
+import asyncio
+
+
+async def main():
+    # Define the APC Mini, first argument: MIDI in, second argument: MIDI out
+    apc = controllers.APCMini('APC MINI MIDI 1', 'APC MINI MIDI 1')
+    await apc.connect(timeout=5)  # Waits for the APC Mini to identify itself
+
+    apc.reset()  # turn off all leds
+
+    async for event in apc.events():  # Events are delivered on this event loop, no extra threads needed
+        if isinstance(event, controllers.APCMini.GridButton):
+            apc.gridbuttons.set_led(event.x, event.y, "green" if event.state else "off")
+        elif isinstance(event, controllers.APCMini.Fader):
+            print(f"Fader {event.fader_id} on {event.controller.name} was set to {event.value}!")
+
+
+asyncio.run(main())
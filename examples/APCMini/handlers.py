@@ -0,0 +1,31 @@
+from akai_pro_py import controllers
+
+# Define the APC Mini, first argument: MIDI in, second argument: MIDI out
+apc = controllers.APCMini('APC MINI MIDI 1', 'APC MINI MIDI 1')
+
+apc.reset()  # turn off all leds
+
+
+# Handlers are only called for the controls they are registered for, anything else is ignored before an event is made
+@apc.on_grid_button(y=0)  # Every button on the bottom row
+def on_bottom_row(event):
+    apc.gridbuttons.set_led(event.x, event.y, "green" if event.state else "off")
+
+
+@apc.on_grid_button(x=7, y=7)  # Only the top right button
+def on_top_right(event):
+    print(f"Top right button was changed to {event.state} on {event.controller.name}")
+
+
+@apc.on_fader(8)  # Only the master fader
+def on_master_fader(event):
+    print(f"Master fader was set to {event.value}")
+
+
+@apc.on_shift_button()
+def on_shift(event):
+    if event.state:
+        apc.reset()
+
+
+apc.start()  # Starts the event loop
@@ -1,12 +1,14 @@
 from akai_pro_py import controllers
-from scipy.interpolate import interp1d
+from akai_pro_py.hub import ControllerHub
 
 
 # Define the MIDI Mix and APC Mini, first argument: MIDI in, second argument: MIDI out
 midi_mix = controllers.MIDIMix('MIDI Mix MIDI 1', 'MIDI Mix MIDI 1')
 apc = controllers.APCMini('APC MINI MIDI 1', 'APC MINI MIDI 1')
 
-midi_to_led = interp1d([0, 127], [0, 7])  # Creates a map from the 7 bit values of MIDI to a 3 bit value for display
+fader_levels = [0] * 8  # Latest value of each fader, shown as a level meter on the grid
+
+hub = ControllerHub([midi_mix, apc])  # Handles both controllers from one thread, in the order messages arrive
 
 apc.reset()  # turn off all leds
 midi_mix.reset()
@@ -52,18 +54,8 @@ def on_event_apc_mini(event):  # Register event function
     elif isinstance(event, controllers.APCMini.Fader):
         if event.fader_id == 8:  # Ignore fader ID 8 (the master fader)
             return
-        value = int(midi_to_led(event.value))  # Map the MIDI value (0,127) to 3 bit (0,7)
-        if value == 0:  # If the value is 0 (fader at minimum)
-            for i in range(0, 8):
-                apc.gridbuttons.set_led(event.fader_id, i, "off")  # Set all LEDs in the column to off
-        elif value == 7:  # If the value is 7 (fader at maximum)
-            for i in range(0, 8):
-                apc.gridbuttons.set_led(event.fader_id, i, "green")  # Set all LEDs in column to green
-        else:
-            for i in range(0, value):  # Go through all the LEDs that should be on
-                apc.gridbuttons.set_led(event.fader_id, i, "green")  # and set them to green
-            for i in range(value+1, 8):  # Go through all the LEDs that should be off
-                apc.gridbuttons.set_led(event.fader_id, i, "off")   # and set them to off
+        fader_levels[event.fader_id] = event.value
+        apc.gridbuttons.meter(fader_levels)  # Draws every fader as a bar and only sends the LEDs that changed
 
 
-midi_mix.start()  # Start event loop
+hub.run()  # Handle both controllers until interrupted
@@ -0,0 +1,22 @@
+from akai_pro_py import controllers
+from akai_pro_py.simulator import VirtualAPCMini
+import time
+
+# A simulated APC Mini, no hardware is needed
+device = VirtualAPCMini()
+apc = device.connect()  # Creates an APCMini connected to the simulated device
+
+
+@apc.on_event
+def on_control_event(event):
+    if isinstance(event, controllers.APCMini.GridButton):
+        apc.gridbuttons.set_led(event.x, event.y, "red" if event.state else "off")
+
+
+device.press_grid(2, 3)  # Press a grid button on the simulated device
+time.sleep(0.1)
+print(f"Grid LED 2,3 is showing colour {device.grid_led(2, 3)}")
+
+device.generate(rate=500, duration=2, seed=1)  # Random fader moves and button presses for 2 seconds
+time.sleep(2)
+device.close()
@@ -13,6 +13,15 @@ setup(
                       'asyncio',
                       'python-rtmidi'
                       ],
+    extras_require={
+        'numpy': ['numpy'],  # Vectorised meter rendering
+        'test': ['pytest'],
+    },
+    entry_points={
+        'console_scripts': [
+            'akai-pro-py=akai_pro_py.cli:main',
+        ],
+    },
 
     classifiers=[
         'Development Status :: 3 - Alpha',
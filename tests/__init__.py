@@ -0,0 +1,10 @@
+import time
+
+
+def wait_until(condition, timeout=1):
+    """Polls condition until it is true or timeout seconds pass, returns its last result.
+    The simulated devices deliver input from their own thread, so tests wait for it to arrive"""
+    end = time.monotonic() + timeout
+    while not condition() and time.monotonic() < end:
+        time.sleep(0.002)
+    return condition()
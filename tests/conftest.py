@@ -0,0 +1,36 @@
+import pytest
+
+from akai_pro_py.simulator import VirtualAPCMini, VirtualMIDIMix
+
+
+@pytest.fixture
+def device():
+    """A simulated APC Mini, closed after the test"""
+    device = VirtualAPCMini()
+    yield device
+    device.close()
+
+
+@pytest.fixture
+def apc(device):
+    """An identified APC Mini driving the simulated device, with every LED off"""
+    apc = device.connect()
+    apc.identify()
+    apc.reset()
+    yield apc
+    apc.close()
+
+
+@pytest.fixture
+def mix_device():
+    device = VirtualMIDIMix()
+    yield device
+    device.close()
+
+
+@pytest.fixture
+def mix(mix_device):
+    mix = mix_device.connect()
+    mix.identify()
+    yield mix
+    mix.close()
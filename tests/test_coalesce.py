@@ -0,0 +1,46 @@
+from akai_pro_py.APCmini import APCMini
+
+from . import wait_until
+
+
+def test_only_latest_value_is_dispatched(apc, device):
+    values = []
+    apc.on_fader()(lambda event: values.append((event.fader_id, event.value)))
+    apc.use_coalescing(window=None)
+    for value in range(20):
+        device.move_fader(0, value)
+        device.move_fader(1, 100 - value)
+    assert wait_until(lambda: apc.mirror.value(APCMini.FaderMapping[1]) == 81)
+    assert values == []
+    assert apc.dispatch_pending() == 2
+    assert values == [(0, 19), (1, 81)]
+    assert apc.dispatch_pending() == 0
+
+
+def test_window(apc, device):
+    values = []
+    apc.on_fader(0)(lambda event: values.append(event.value))
+    apc.use_coalescing(window=0.05)
+    for value in range(20):
+        device.move_fader(0, value)
+    assert wait_until(lambda: values)
+    assert values[-1] == 19
+    assert len(values) < 20
+
+
+def test_buttons_are_not_held_back(apc, device):
+    presses = []
+    apc.on_grid_button()(presses.append)
+    apc.use_coalescing(window=None)
+    device.press_grid(0, 0)
+    assert wait_until(lambda: presses)
+
+
+def test_disabling_dispatches_what_is_held(apc, device):
+    values = []
+    apc.on_fader(0)(lambda event: values.append(event.value))
+    apc.use_coalescing(window=None)
+    device.move_fader(0, 7)
+    assert wait_until(lambda: apc.mirror.value(APCMini.FaderMapping[0]) == 7)
+    apc.use_coalescing(False)
+    assert values == [7]
@@ -0,0 +1,52 @@
+import pytest
+
+from akai_pro_py import errors
+from akai_pro_py.APCmini import APCMini
+from akai_pro_py.ring import EventRingReader
+
+
+def test_lazy_controller_opens_on_first_write(device):
+    apc = APCMini(device.midi_in, device.midi_out, lazy=True)
+    assert apc.state == apc.Closed
+    apc.gridbuttons.set_led(0, 0, "red")
+    assert apc.state != apc.Closed
+    assert device.grid_led(0, 0) == APCMini.GridColours["red"]
+    apc.close()
+
+
+def test_writes_after_close_raise(apc, device):
+    events = []
+    apc.on_event(events.append)
+    apc.close()
+    received = device.received
+    with pytest.raises(errors.AkaiProPyError):
+        apc.gridbuttons.set_led(0, 0, "red")
+    assert apc.state == apc.Closed
+    assert device.received == received  # No Device Enquiry, nothing sent
+    device.press_grid(0, 0)
+    device.close()  # Waits for the press to be delivered
+    assert events == []
+
+
+def test_open_after_close(apc, device):
+    apc.close()
+    apc.identify()
+    assert apc.state == apc.Ready
+    apc.gridbuttons.set_led(1, 1, "green")
+    assert device.grid_led(1, 1) == APCMini.GridColours["green"]
+
+
+def test_close_stops_everything(apc, tmp_path):
+    ring = apc.start_publishing(capacity=16)
+    server = apc.serve_leds(str(tmp_path / "leds.sock"))
+    apc.use_input_queue()
+    apc.use_handler_pool()
+    apc.use_coalescing()
+    apc.use_gestures()
+    apc.close()
+    assert (apc.event_ring, apc.input_queue, apc.handler_pool, apc.coalescer, apc.gestures) == (None,) * 5
+    assert apc.led_servers == []
+    assert server.thread is None
+    assert not (tmp_path / "leds.sock").exists()
+    with pytest.raises(FileNotFoundError):
+        EventRingReader(ring.name)
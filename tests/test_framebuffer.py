@@ -0,0 +1,32 @@
+from akai_pro_py.APCmini import APCMini
+
+
+def test_flush_sends_only_changes(apc, device):
+    apc.gridbuttons.draw(0, 0, "red")
+    apc.gridbuttons.draw(1, 0, "green")
+    assert apc.flush() == 2
+    assert apc.flush() == 0
+    assert (device.grid_led(0, 0), device.grid_led(1, 0)) == (APCMini.GridColours["red"], APCMini.GridColours["green"])
+
+
+def test_draw_during_send_is_sent_by_the_next_flush(apc, device):
+    note = APCMini.GridMapping[0][0]
+    send_bytes = apc.send_bytes
+
+    def send_and_draw(data):
+        send_bytes(data)
+        apc.framebuffer.draw(note, APCMini.GridColours["green"])  # Another thread drawing while the batch is sent
+
+    apc.send_bytes = send_and_draw
+    apc.gridbuttons.draw(0, 0, "red")
+    assert apc.flush() == 1
+    assert device.grid_led(0, 0) == APCMini.GridColours["red"]
+    apc.send_bytes = send_bytes
+    assert apc.flush() == 1
+    assert device.grid_led(0, 0) == APCMini.GridColours["green"]
+
+
+def test_invalidate_resends_everything(apc):
+    apc.flush()
+    apc.framebuffer.invalidate()
+    assert apc.flush() == len(apc.framebuffer.notes)
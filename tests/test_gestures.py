@@ -0,0 +1,110 @@
+import time
+
+import pytest
+
+
+class Recorded:
+    """Every gesture recognized, as (kind, [(x, y) of each button])"""
+
+    def __init__(self, recognizer):
+        self.gestures = []
+        recognizer.on_long_press(lambda gesture: self.gestures.append(("long_press", [self.xy(gesture.button)])))
+        recognizer.on_double_tap(lambda gesture: self.gestures.append(("double_tap", [self.xy(gesture.button)])))
+        recognizer.on_chord(lambda gesture: self.gestures.append(("chord", [self.xy(b) for b in gesture.buttons])))
+        recognizer.on_drag(lambda gesture: self.gestures.append(("drag", [self.xy(b) for b in gesture.buttons])))
+
+    @staticmethod
+    def xy(button):
+        return button.x, button.y
+
+    def wait(self, count, timeout=1):
+        """Returns the gestures once count were recognized, or whatever there is after timeout seconds"""
+        end = time.monotonic() + timeout
+        while len(self.gestures) < count and time.monotonic() < end:
+            time.sleep(0.005)
+        return self.gestures
+
+
+def settle(seconds=0.03):
+    """Gives the simulated device time to deliver what was sent"""
+    time.sleep(seconds)
+
+
+@pytest.fixture
+def gestures(apc):
+    recorded = Recorded(apc.use_gestures(long_press=0.2, double_tap=0.15, chord_window=0.05))
+    yield recorded
+    apc.use_gestures(False)
+
+
+def test_long_press(device, gestures):
+    device.press_grid(0, 0)
+    assert gestures.wait(1) == [("long_press", [(0, 0)])]
+    device.release_grid(0, 0)
+
+
+def test_short_press_is_not_a_long_press(device, gestures):
+    device.press_grid(0, 0)
+    settle()
+    device.release_grid(0, 0)
+    time.sleep(0.3)
+    assert gestures.gestures == []
+
+
+def test_double_tap(device, gestures):
+    for _ in range(2):
+        device.press_grid(1, 1)
+        settle(0.01)
+        device.release_grid(1, 1)
+        settle(0.01)
+    assert gestures.wait(1) == [("double_tap", [(1, 1)])]
+
+
+def test_slow_taps_are_not_a_double_tap(device, gestures):
+    for _ in range(2):
+        device.press_grid(1, 1)
+        settle(0.01)
+        device.release_grid(1, 1)
+        time.sleep(0.2)
+    assert gestures.gestures == []
+
+
+def test_chord(device, gestures):
+    device.press_grid(3, 3)
+    device.press_grid(6, 6)
+    settle()
+    device.release_grid(3, 3)
+    device.release_grid(6, 6)
+    assert gestures.wait(1) == [("chord", [(3, 3), (6, 6)])]
+
+
+def test_presses_further_apart_than_the_chord_window_are_not_a_chord(device, gestures):
+    device.press_grid(0, 0)
+    settle(0.1)
+    device.press_grid(5, 5)
+    settle()
+    device.release_grid(0, 0)
+    device.release_grid(5, 5)
+    time.sleep(0.3)
+    assert gestures.gestures == []  # Not a long press either, another button was pressed
+
+
+def test_drag(device, gestures):
+    for x in range(4):
+        device.press_grid(x, 4)
+        settle(0.06)
+        if x:
+            device.release_grid(x - 1, 4)
+    device.release_grid(3, 4)
+    assert gestures.wait(1) == [("drag", [(0, 4), (1, 4), (2, 4), (3, 4)])]
+
+
+def test_drag_needs_neighbours(device, gestures):
+    device.press_grid(0, 4)
+    settle(0.06)
+    device.press_grid(2, 4)
+    settle(0.06)
+    device.release_grid(0, 4)
+    device.release_grid(2, 4)
+    time.sleep(0.3)
+    assert gestures.gestures == []
@@ -0,0 +1,76 @@
+import threading
+import time
+
+import mido
+
+from akai_pro_py.APCmini import APCMini
+from akai_pro_py.hub import ControllerHub
+
+from . import wait_until
+
+
+def test_input_order_across_batches(device):
+    apc = device.connect()
+    hub = ControllerHub([apc]).start()
+    assert apc.identified.wait(1)
+    values = []
+    done = threading.Event()
+
+    @apc.on_fader()
+    def on_fader(event):
+        values.append(event.value)
+        if len(values) == 3 * ControllerHub.Batch:
+            done.set()
+
+    hub.stop()  # Everything is queued before the hub runs, so batches fill up
+    for value in range(3 * ControllerHub.Batch):
+        hub.receive(apc, mido.Message("control_change", control=APCMini.FaderMapping[0], value=value % 128),
+                    time.monotonic_ns())
+    hub.start()
+    assert done.wait(2)
+    hub.stop()
+    assert values == [value % 128 for value in range(3 * ControllerHub.Batch)]
+
+
+def test_note_on_and_off_stay_paired(device):
+    apc = device.connect()
+    hub = ControllerHub([apc]).start()
+    assert apc.identified.wait(1)
+    states = []
+    done = threading.Event()
+
+    @apc.on_grid_button()
+    def on_grid(event):
+        states.append(event.state)
+        if len(states) == ControllerHub.Batch + 1:
+            done.set()
+
+    hub.stop()
+    for i in range(ControllerHub.Batch + 1):
+        message_type = "note_on" if i % 2 == 0 else "note_off"
+        hub.receive(apc, mido.Message(message_type, note=0), time.monotonic_ns())
+    hub.start()
+    assert done.wait(2)
+    hub.stop()
+    assert states == [i % 2 == 0 for i in range(ControllerHub.Batch + 1)]
+
+
+def test_failing_handler_does_not_stop_the_hub(device):
+    apc = device.connect()
+    hub = ControllerHub([apc]).start()
+    assert apc.identified.wait(1)
+    pressed = threading.Event()
+
+    @apc.on_grid_button(0, 0)
+    def failing(event):
+        raise ValueError("handler failed")
+
+    apc.on_grid_button(1, 1)(lambda event: pressed.set())
+    device.press_grid(0, 0)
+    device.press_grid(1, 1)
+    assert pressed.wait(1)
+    assert hub.thread.is_alive()
+    assert apc.stats()["errors"] == 1
+    apc.gridbuttons.set_led(2, 2, "red")  # Output is still sent
+    assert wait_until(lambda: device.grid_led(2, 2) == APCMini.GridColours["red"])
+    hub.stop()
@@ -0,0 +1,125 @@
+import threading
+
+import mido
+import pytest
+
+from akai_pro_py import errors
+from akai_pro_py.APCmini import APCMini
+
+
+def fader(fader_id, value):
+    return mido.Message("control_change", control=APCMini.FaderMapping[fader_id], value=value)
+
+
+def grid(x, y):
+    return mido.Message("note_on", note=APCMini.GridMapping[x][y], velocity=127)
+
+
+def describe(event):
+    if hasattr(event, "fader_id"):
+        return "fader", event.fader_id, event.value
+    return "grid", event.x, event.y
+
+
+class HeldQueue:
+    """An input queue on an APC Mini that a handler holds up until release() is called"""
+
+    def __init__(self, apc, size, policy):
+        self.apc = apc
+        self.handled = []
+        self.entered = threading.Event()
+        self.gate = threading.Event()
+        self.apc.on_event(self.on_event)
+        self.apc.use_input_queue(size=size, policy=policy)
+        self.feed(grid(7, 7))  # Taken off the queue straight away, then holds up the input thread
+        assert self.entered.wait(1)
+
+    def on_event(self, event):
+        self.entered.set()
+        self.gate.wait()
+        self.handled.append(describe(event))
+
+    def feed(self, message):
+        self.apc.midi_in.feed(message)
+
+    def release(self):
+        """Lets every queued message be handled and returns what was handled after the first press"""
+        self.gate.set()
+        self.apc.use_input_queue(False)
+        return self.handled[1:]
+
+
+def test_unknown_policy(apc):
+    with pytest.raises(errors.AkaiProPyError):
+        apc.use_input_queue(policy="newest")
+
+
+def test_drop_oldest(apc):
+    held = HeldQueue(apc, 3, "drop_oldest")
+    for value in range(5):
+        held.feed(fader(0, value))
+    queue = held.apc.input_queue
+    assert (queue.dropped, queue.high_water) == (2, 3)
+    assert held.release() == [("fader", 0, 2), ("fader", 0, 3), ("fader", 0, 4)]
+
+
+def test_drop_newest(apc):
+    held = HeldQueue(apc, 3, "drop_newest")
+    for value in range(5):
+        held.feed(fader(0, value))
+    assert held.apc.input_queue.dropped == 2
+    assert held.release() == [("fader", 0, 0), ("fader", 0, 1), ("fader", 0, 2)]
+
+
+def test_block(apc):
+    held = HeldQueue(apc, 2, "block")
+    feeder = threading.Thread(target=lambda: [held.feed(fader(0, value)) for value in range(5)])
+    feeder.start()
+    feeder.join(0.1)
+    assert feeder.is_alive()  # Waiting for space in the full queue
+    assert len(held.apc.input_queue) == 2
+    held.gate.set()
+    feeder.join(1)
+    assert held.release() == [("fader", 0, value) for value in range(5)]
+
+
+def test_close_keeps_blocked_messages(apc):
+    held = HeldQueue(apc, 1, "block")
+    held.feed(fader(0, 0))
+    feeder = threading.Thread(target=held.feed, args=(fader(0, 1),))
+    feeder.start()
+    feeder.join(0.1)
+    assert feeder.is_alive()
+    assert held.release() == [("fader", 0, 0), ("fader", 0, 1)]
+    feeder.join(1)
+
+
+def test_latest_keeps_last_value_in_place(apc):
+    held = HeldQueue(apc, 4, "latest")
+    held.feed(fader(0, 1))
+    held.feed(grid(0, 0))
+    held.feed(fader(0, 2))
+    held.feed(fader(0, 3))
+    assert held.apc.input_queue.dropped == 0  # Replacing a queued value is not a drop while there is space
+    assert held.release() == [("fader", 0, 3), ("grid", 0, 0)]
+
+
+def test_latest_controls_never_replace_notes(apc):
+    held = HeldQueue(apc, 64, "latest")
+    for note in range(49):  # Queue keys of these presses overlap the control numbers of the faders
+        held.feed(mido.Message("note_on", note=note, velocity=127))
+    held.feed(mido.Message("control_change", control=48, value=5))
+    assert held.apc.input_queue.dropped == 0
+    handled = held.release()
+    assert len(handled) == 50
+    assert handled[-1] == ("fader", 0, 5)
+
+
+def test_latest_drops_new_notes_when_full(apc):
+    held = HeldQueue(apc, 2, "latest")
+    held.feed(fader(0, 1))
+    held.feed(grid(0, 0))
+    held.feed(grid(1, 1))  # Dropped, the queue is full
+    held.feed(fader(0, 2))  # Replaces the queued value, which a full queue could not have kept as well
+    assert held.apc.input_queue.dropped == 2
+    assert held.release() == [("fader", 0, 2), ("grid", 0, 0)]
@@ -0,0 +1,143 @@
+import socket
+import time
+
+import pytest
+
+from akai_pro_py import errors
+from akai_pro_py.APCmini import APCMini, InvalidButtonColour
+from akai_pro_py.ledserver import LEDClient, LEDServer
+
+
+def grid(x, y):
+    return APCMini.GridMapping[x][y]
+
+
+@pytest.fixture(params=["unix", "tcp"])
+def server(request, apc, tmp_path):
+    address = str(tmp_path / "leds.sock") if request.param == "unix" else ("127.0.0.1", 0)
+    server = apc.serve_leds(address)
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def client(server):
+    with LEDClient(server.address) as client:
+        yield client
+
+
+def test_set(client, device):
+    client.set(grid(0, 0), 1)
+    client.set(grid(1, 0), 3)
+    client.sync()
+    assert (device.grid_led(0, 0), device.grid_led(1, 0)) == (1, 3)
+
+
+def test_set_many_and_fill(client, device):
+    client.fill(5)
+    client.sync()
+    assert all(device.grid_led(x, y) == 5 for x in range(8) for y in range(8))
+    client.fill(1, [grid(0, 0), grid(1, 1)])
+    client.set_many([(grid(2, 2), 3), (grid(3, 3), 3)])
+    client.sync()
+    assert [device.grid_led(i, i) for i in range(5)] == [1, 1, 3, 3, 5]
+    client.clear()
+    client.sync()
+    assert not any(device.grid_led(x, y) for x in range(8) for y in range(8))
+
+
+def test_fill_with_no_notes_sets_nothing(client, device):
+    client.fill(3, [])
+    client.sync()
+    assert not any(device.grid_led(x, y) for x in range(8) for y in range(8))
+
+
+def test_fill_with_many_notes(apc, client, device):
+    notes = [note for column in APCMini.GridMapping for note in column] * 5  # More than one FILL command holds
+    client.fill(2, notes)
+    client.sync()
+    assert all(device.grid_led(x, y) == 2 for x in range(8) for y in range(8))
+
+
+def test_show_page(apc, client, device):
+    apc.define_page("one", [(grid(4, 4), 1)])
+    client.fill(3)
+    client.show_page("one")
+    client.show_page("missing")  # Ignored
+    client.sync()
+    assert (device.grid_led(4, 4), device.grid_led(0, 0)) == (1, 0)
+
+
+def test_pipelined_commands_are_sent_as_one_batch(apc, client, device):
+    sent = []
+    send_bytes = apc.send_bytes
+    apc.send_bytes = lambda data: (sent.append(data), send_bytes(data))
+    final = {}
+    for i in range(1000):
+        client.set(grid(i % 8, i // 8 % 8), i % 7)
+        final[grid(i % 8, i // 8 % 8)] = i % 7
+    client.sync()
+    assert len(sent) == 1
+    assert len(sent[0]) == 3 * sum(colour != 0 for colour in final.values())  # Only LEDs that end up changed
+    assert all(device.leds[note] == colour for note, colour in final.items())
+
+
+def test_commands_split_across_writes(client, device):
+    client.set(grid(6, 6), 4)
+    client.set_many([(grid(5, 5), 2), (grid(4, 4), 3)])
+    client.fill(1, [grid(3, 3)])
+    client.show_page("missing")
+    commands, client.buffer = bytes(client.buffer), bytearray()
+    for i in range(len(commands)):
+        client.socket.sendall(commands[i:i + 1])
+        time.sleep(0.001)  # Gives the server a read between every byte
+    client.sync()
+    assert [device.grid_led(i, i) for i in range(3, 7)] == [1, 3, 2, 4]
+
+
+def test_invalid_colours_are_skipped(apc, server, client, device):
+    client.set(grid(0, 0), 2)
+    client.set(grid(0, 0), 100)  # The grid only accepts 0 to 6
+    client.set_many([(grid(1, 1), 7), (127, 1)])  # 127 has no LED
+    client.fill(100, [grid(2, 2)])
+    client.sync()
+    assert (device.grid_led(0, 0), device.grid_led(1, 1), device.grid_led(2, 2)) == (2, 0, 0)
+    assert server.skipped == 4
+    with pytest.raises(InvalidButtonColour):  # The same colours set_led rejects
+        apc.gridbuttons.set_led(0, 0, 100)
+
+
+def test_fill_skips_leds_without_the_colour(mix, mix_device, tmp_path):
+    server = mix.serve_leds(str(tmp_path / "mix.sock"))
+    with LEDClient(server.address) as client:
+        client.fill(1)
+        client.set(mix.MuteMapping[0], 5)  # MIDI Mix LEDs are only on or off
+        client.sync()
+    server.stop()
+    assert all(mix_device.leds[note] == 1 for note in mix.MuteMapping + mix.RecArmMapping)
+    assert server.skipped == 1
+
+
+def test_unknown_command_ends_the_connection(client):
+    client.socket.sendall(bytes((0x7F,)))
+    with pytest.raises(errors.AkaiProPyError):
+        client.sync()
+
+
+def test_stale_socket_is_replaced(apc, tmp_path):
+    path = str(tmp_path / "leds.sock")
+    stale = socket.socket(socket.AF_UNIX)
+    stale.bind(path)
+    stale.close()
+    server = apc.serve_leds(path)
+    with LEDClient(path) as client:
+        client.sync()
+    server.stop()
+
+
+def test_other_files_are_not_removed(apc, tmp_path):
+    path = tmp_path / "leds.sock"
+    path.write_text("keep me")
+    with pytest.raises(errors.AkaiProPyError):
+        LEDServer(apc, str(path))
+    assert path.read_text() == "keep me"
@@ -0,0 +1,55 @@
+import threading
+
+from akai_pro_py.APCmini import APCMini
+
+
+def test_page_is_not_shown_until_asked(apc, device):
+    with apc.page("mixer"):
+        apc.gridbuttons.fill_row(0, "green")
+        apc.gridbuttons.set_led(3, 3, "red")
+    assert device.grid_led(0, 0) == 0
+    assert device.grid_led(3, 3) == 0
+    assert apc.show_page("mixer") == 9
+    assert device.grid_led(0, 0) == APCMini.GridColours["green"]
+    assert device.grid_led(3, 3) == APCMini.GridColours["red"]
+    assert apc.show_page("mixer") == 0  # Already shown
+
+
+def test_show_page_sends_only_differences(apc, device):
+    apc.define_page("one", [(APCMini.GridMapping[0][0], 1), (APCMini.GridMapping[1][1], 1)])
+    apc.define_page("two", [(APCMini.GridMapping[0][0], 1), (APCMini.GridMapping[2][2], 1)])
+    assert apc.show_page("one") == 2
+    assert apc.show_page("two") == 2
+    assert (device.grid_led(0, 0), device.grid_led(1, 1), device.grid_led(2, 2)) == (1, 0, 1)
+
+
+def test_save_page(apc):
+    apc.gridbuttons.set_led(4, 4, "yellow")
+    apc.save_page("snapshot")
+    apc.gridbuttons.clear()
+    apc.show_page("snapshot")
+    assert apc.framebuffer.get(APCMini.GridMapping[4][4]) == APCMini.GridColours["yellow"]
+
+
+def test_other_threads_draw_live_while_a_page_is_defined(apc, device):
+    note = APCMini.GridMapping[7][7]
+    with apc.page("p"):
+        apc.gridbuttons.draw(0, 0, "green")
+        other = threading.Thread(target=apc.gridbuttons.set_many, args=([(7, 7, "red")],))
+        other.start()
+        other.join(1)
+        assert not other.is_alive()
+        assert apc.framebuffer.get(note) == 0  # This thread only sees the page
+    assert device.grid_led(7, 7) == APCMini.GridColours["red"]
+    assert device.grid_led(0, 0) == 0
+    assert apc.framebuffer.get(note) == APCMini.GridColours["red"]
+    assert apc.framebuffer.pages["p"][apc.framebuffer.notes.index(note)] == 0
+    assert apc.framebuffer.pages["p"][apc.framebuffer.notes.index(APCMini.GridMapping[0][0])] == 1
+
+
+def test_meter_inside_page(apc, device):
+    with apc.page("levels"):
+        apc.gridbuttons.meter([127] * 8)
+    assert device.grid_led(0, 7) == 0
+    apc.show_page("levels")
+    assert device.grid_led(0, 7) != 0
@@ -0,0 +1,65 @@
+import multiprocessing
+import queue
+
+from akai_pro_py.APCmini import APCMini
+from akai_pro_py.ring import EventRingReader
+
+from . import wait_until
+
+
+def describe(event):
+    if isinstance(event, APCMini.Fader):
+        return "fader", event.fader_id, event.value
+    return "grid", event.x, event.y, event.state
+
+
+def read_events(name, count, results):
+    reader = EventRingReader(name)
+    events = []
+    wait_until(lambda: events.extend(describe(event) for received, event in reader.read()) or len(events) >= count,
+               timeout=5)
+    results.put(events)
+    reader.close()
+
+
+def test_reader_sees_published_events(apc, device):
+    ring = apc.start_publishing(capacity=64)
+    reader = EventRingReader(ring.name)
+    device.move_fader(2, 10)
+    device.press_grid(1, 3)
+    events = []
+    assert wait_until(lambda: events.extend(event for received, event in reader.read()) or len(events) == 2)
+    assert [describe(event) for event in events] == [("fader", 2, 10), ("grid", 1, 3, True)]
+    reader.close()
+    apc.stop_publishing()
+
+
+def test_reader_that_falls_behind_skips_to_oldest(apc, device):
+    ring = apc.start_publishing(capacity=16)
+    reader = EventRingReader(ring.name)
+    for value in range(40):
+        device.move_fader(0, value)
+    assert wait_until(lambda: ring.position == 40)
+    events = reader.read()
+    assert [event.value for received, event in events] == list(range(24, 40))
+    assert reader.lost == 24
+    reader.close()
+    apc.stop_publishing()
+
+
+def test_reader_in_another_process(apc, device):
+    ring = apc.start_publishing(capacity=64)
+    results = multiprocessing.get_context("spawn").Queue()
+    process = multiprocessing.get_context("spawn").Process(target=read_events, args=(ring.name, 1, results))
+    process.start()
+    events = []
+    for _ in range(100):  # The reader starts from the events published after it attached, so keep publishing
+        device.move_fader(4, 99)
+        try:
+            events = results.get(timeout=0.1)
+            break
+        except queue.Empty:
+            pass
+    process.join(5)
+    apc.stop_publishing()
+    assert events[0] == ("fader", 4, 99)
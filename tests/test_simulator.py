@@ -0,0 +1,50 @@
+import mido
+import pytest
+
+from akai_pro_py import errors
+from akai_pro_py.APCmini import APCMini
+from akai_pro_py.MIDIMix import MIDIMix
+
+from . import wait_until
+
+
+def test_identifies(apc, mix):
+    assert apc.state == apc.Ready
+    assert mix.state == mix.Ready
+
+
+def test_wrong_device_fails_to_identify(device):
+    controller = MIDIMix(device.midi_in, device.midi_out, lazy=True)
+    with pytest.raises(errors.ControllerIdentificationError):
+        controller.identify(timeout=0.2, retries=0)
+    assert controller.state == controller.Failed
+
+
+def test_tracks_leds(apc, device, mix, mix_device):
+    apc.gridbuttons.set_led(2, 5, "red")
+    assert device.grid_led(2, 5) == APCMini.GridColours["red"]
+    apc.gridbuttons.set_led(2, 5, "off")
+    assert device.grid_led(2, 5) == 0
+    mix.mutebuttons.set_led(3, "on")
+    assert mix_device.leds[MIDIMix.MuteMapping[3]] == 1
+
+
+def test_scripted_traffic(apc, device):
+    events = []
+    apc.on_event(events.append)
+    device.play([(0, mido.Message("note_on", note=APCMini.GridMapping[1][2], velocity=127)),
+                 (0.01, mido.Message("control_change", control=APCMini.FaderMapping[3], value=64)),
+                 (0.01, mido.Message("note_off", note=APCMini.GridMapping[1][2]))], speed=2)
+    assert wait_until(lambda: len(events) == 3)
+    press, fader, release = events
+    assert (press.x, press.y, press.state) == (1, 2, True)
+    assert (fader.fader_id, fader.value) == (3, 64)
+    assert release.state is False
+
+
+def test_random_traffic(mix, mix_device):
+    events = []
+    mix.on_event(events.append)
+    mix_device.generate(rate=2000, count=100, seed=1, buttons=False).wait(0.5)
+    assert wait_until(lambda: len(events) == 100)
+    assert all(0 <= event.value <= 127 for event in events)
@@ -0,0 +1,56 @@
+import threading
+import time
+
+from akai_pro_py.APCmini import APCMini
+
+from . import wait_until
+
+
+def test_same_control_in_order_different_controls_in_parallel(apc, device):
+    seen = {}
+    threads = set()
+    lock = threading.Lock()
+
+    @apc.on_fader()
+    def slow(event):
+        time.sleep(0.002)
+        with lock:
+            seen.setdefault(event.fader_id, []).append(event.value)
+            threads.add(threading.current_thread().name)
+
+    apc.use_handler_pool(workers=4)
+    for value in range(40):
+        for fader in range(4):
+            device.move_fader(fader, value)
+    assert wait_until(lambda: sum(map(len, seen.values())) == 160, timeout=2)
+    apc.use_handler_pool(False)
+    assert all(seen[fader] == list(range(40)) for fader in range(4))
+    assert len(threads) > 1
+
+
+def test_failing_handler_does_not_stop_the_next(apc, device):
+    handled = []
+
+    @apc.on_grid_button(0, 0)
+    def flaky(event):
+        handled.append(event.state)
+        raise ValueError("handler failed")
+
+    apc.use_handler_pool(workers=2)
+    device.press_grid(0, 0)
+    device.release_grid(0, 0)
+    assert wait_until(lambda: len(handled) == 2)
+    apc.use_handler_pool(False)
+    assert handled == [True, False]
+    assert apc.stats()["errors"] == 2
+
+
+def test_close_handles_everything_queued(apc, device):
+    handled = []
+    apc.on_fader(0)(lambda event: (time.sleep(0.001), handled.append(event.value)))
+    apc.use_handler_pool(workers=2)
+    for value in range(50):
+        device.move_fader(0, value)
+    assert wait_until(lambda: apc.mirror.value(APCMini.FaderMapping[0]) == 49)  # Every move was dispatched
+    apc.use_handler_pool(False)  # Waits for every queued event to be handled
+    assert handled == list(range(50))